@@ -1,12 +1,14 @@
-from .age_evaluator import AgeEvaluator
+from .age_evaluator import AgeEvaluator, cached_age
 from .evaluator import ValueBoundryError
 from .grade_reference import GradeReference, GRADE1, GRADE2, GRADE3, GRADE4, GRADE5
+from .instrumentation import InMemorySink, LoggingSink, CallbackSink
 from .normal_reference import NormalReference
-from .parsers import parse, unparse, ParserError
+from .parsers import parse, unparse, ParserError, ULN, LLN
 from .site_reportables import site_reportables
 from .units import CELLS_PER_MILLIMETER_CUBED, COPIES_PER_MILLILITER, MM3, MM3_DISPLAY
 from .units import IU_LITER, GRAMS_PER_DECILITER, TEN_X_9_PER_LITER, TEN_X_3_PER_LITER
 from .units import MILLIGRAMS_PER_DECILITER, MILLIMOLES_PER_LITER, MICROMOLES_PER_LITER
 from .units import CELLS_PER_MILLIMETER_CUBED_DISPLAY, TEN_X_3_PER_LITER_DISPLAY
 from .units import TEN_X_9_PER_LITER_DISPLAY, MICROMOLES_PER_LITER_DISPLAY
+from .units import unit_conversions, ConversionNotFound
 from .value_reference_group import ValueReferenceGroup, NotEvaluated
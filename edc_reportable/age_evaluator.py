@@ -1,10 +1,41 @@
 from edc_base.utils import age, get_utcnow
+from functools import lru_cache
 
 from .evaluator import Evaluator
 
 
+def get_age(dob, report_datetime=None):
+    """Returns the age as a relativedelta at `report_datetime`
+    or, if None, now.
+    """
+    return age(dob, report_datetime or get_utcnow())
+
+
+def cached_age(dob, report_datetime=None):
+    """Returns the age as a relativedelta, memoized on
+    (dob, report_datetime).
+
+    The age now, where `report_datetime` is None, is not cached.
+    The returned relativedelta is shared; do not change it.
+    """
+    if report_datetime is None:
+        return get_age(dob)
+    return _cached_age(dob, report_datetime)
+
+
+@lru_cache(maxsize=4096)
+def _cached_age(dob, report_datetime):
+    return age(dob, report_datetime)
+
+
+cached_age.cache_info = _cached_age.cache_info
+cached_age.cache_clear = _cached_age.cache_clear
+
+
 class AgeEvaluator(Evaluator):
 
+    __slots__ = ()
+
     def __init__(self, age_lower=None, age_upper=None, age_units=None,
                  age_lower_inclusive=None, age_upper_inclusive=None, **kwargs):
         kwargs['units'] = age_units or 'years'
@@ -22,9 +53,23 @@ class AgeEvaluator(Evaluator):
         kwargs['placeholder'] = 'AGE'
         return super().description(value=value, **kwargs)
 
-    def in_bounds_or_raise(self, dob=None, report_datetime=None, age_units=None):
-        report_datetime = report_datetime or get_utcnow()
+    def in_bounds(self, dob=None, report_datetime=None, age_units=None, rdelta=None):
+        """Returns True if the age is in bounds, otherwise False.
+        """
+        if rdelta is None:
+            rdelta = age(dob, report_datetime or get_utcnow())
+        return super().in_bounds(
+            getattr(rdelta, self.units), units=age_units or 'years')
+
+    def in_bounds_or_raise(self, dob=None, report_datetime=None, age_units=None,
+                           rdelta=None):
+        """Raises if the age is out of bounds.
+
+        Pass `rdelta`, the age as a relativedelta, if already known
+        instead of `dob` and `report_datetime`.
+        """
         age_units = age_units or 'years'
-        rdelta = age(dob, report_datetime)
+        if rdelta is None:
+            rdelta = age(dob, report_datetime or get_utcnow())
         value = getattr(rdelta, self.units)
         return super().in_bounds_or_raise(value, units=age_units)
@@ -0,0 +1,2 @@
+from .generators import make_collection_data, make_results
+from .suite import compare, run
@@ -0,0 +1,49 @@
+"""Runs the benchmarks, e.g.
+
+    python -m edc_reportable.benchmarks --output after.json --baseline before.json
+"""
+import argparse
+import json
+import os
+import sys
+
+import django
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m edc_reportable.benchmarks')
+    parser.add_argument('--analytes', type=int, default=40)
+    parser.add_argument('--age-bands', type=int, default=6)
+    parser.add_argument('--genders', default='MF',
+                        help='comma separated genders with separate ranges, e.g. M,F')
+    parser.add_argument('--count', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare to the results in this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'edc_reportable.settings')
+    django.setup()
+    from edc_reportable.benchmarks import compare, run
+
+    data = run(analytes=args.analytes, age_bands=args.age_bands,
+               count=args.count, repeat=args.repeat,
+               genders=[list(genders) for genders in args.genders.split(',')])
+    for name, result in data.items():
+        sys.stdout.write(
+            f'{name:<20}{result["n"]:>10}{result["us_per_op"]:>12.2f} us/op\n')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), data, tolerance=args.tolerance)
+        for name, ratio in regressions.items():
+            sys.stdout.write(f'REGRESSION {name}: {ratio:.2f}x slower\n')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import random
+
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from edc_constants.constants import FEMALE, MALE
+from pytz import utc
+
+from ..grade_reference import GRADE3, GRADE4
+from ..parsers import parse as p
+from ..units import MILLIGRAMS_PER_DECILITER
+
+REPORT_DATETIME = utc.localize(datetime(2018, 1, 15))
+
+
+def _age_bands(age_bands):
+    """Returns a list of (age_lower, age_upper) tuples
+    splitting 0 to 100 years into `age_bands` bands.
+    """
+    step = 100 // age_bands
+    return [(x * step, None if x == age_bands - 1 else (x + 1) * step)
+            for x in range(age_bands)]
+
+
+def make_collection_data(analytes=None, age_bands=None, genders=None):
+    """Returns a tuple of (normal_data, grading_data) for a
+    synthetic collection.
+
+    Each analyte has a normal range and two grades for each
+    gender and age band. Pass `genders=[MALE, FEMALE]` for
+    separate ranges by gender.
+    """
+    analytes = analytes or 10
+    age_bands = age_bands or 4
+    genders = genders or [[MALE, FEMALE]]
+    normal_data = {}
+    grading_data = {}
+    for index in range(analytes):
+        name = f'analyte{index}'
+        normal_data[name] = []
+        grading_data[name] = []
+        for band, (age_lower, age_upper) in enumerate(_age_bands(age_bands)):
+            for gender in genders:
+                opts = dict(units=MILLIGRAMS_PER_DECILITER, gender=gender,
+                            age_lower=age_lower, age_upper=age_upper,
+                            age_units='years', age_lower_inclusive=True)
+                normal_data[name].append(p(f'{10 + band}<=x<={20 + band}', **opts))
+                grading_data[name].extend([
+                    p(f'{30 + band}<=x<{40 + band}', grade=GRADE3, **opts),
+                    p(f'{40 + band}<=x', grade=GRADE4, **opts)])
+    return normal_data, grading_data
+
+
+def make_results(analytes=None, count=None, seed=None):
+    """Yields `count` synthetic result records of
+    (name, value, units, gender, dob, report_datetime).
+    """
+    analytes = analytes or 10
+    rnd = random.Random(seed or 0)
+    for _ in range(count or 1000):
+        yield (f'analyte{rnd.randrange(analytes)}',
+               round(rnd.uniform(5, 60), 1),
+               MILLIGRAMS_PER_DECILITER,
+               rnd.choice([MALE, FEMALE]),
+               REPORT_DATETIME - relativedelta(days=rnd.randrange(365, 365 * 90)),
+               REPORT_DATETIME)
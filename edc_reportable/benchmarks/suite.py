@@ -0,0 +1,122 @@
+import os
+
+from collections import deque
+from tempfile import mkdtemp
+from time import perf_counter
+
+from ..parsers import _parse, parse
+from ..site_reportables import Reportables
+from ..value_reference_group import NotEvaluated, np
+from .generators import make_collection_data, make_results
+
+COLLECTION = 'benchmark'
+
+
+def _time(func, repeat=None):
+    """Returns the best of `repeat` timings of func() in seconds.
+    """
+    timings = []
+    for _ in range(repeat or 3):
+        start = perf_counter()
+        func()
+        timings.append(perf_counter() - start)
+    return min(timings)
+
+
+def _evaluate(reportables, results, method):
+    reference_collection = reportables.get(COLLECTION)
+    for name, value, units, gender, dob, report_datetime in results:
+        try:
+            getattr(reference_collection.get(name), method)(
+                value=value, units=units, gender=gender, dob=dob,
+                report_datetime=report_datetime)
+        except NotEvaluated:
+            pass
+
+
+def _parse_all(phrases):
+    """Parses each phrase with an empty parser cache so that
+    parsing is timed rather than cache hits.
+    """
+    _parse.cache_clear()
+    for phrase in phrases:
+        parse(phrase)
+
+
+def _evaluate_many(reportables, results, method):
+    reference_collection = reportables.get(COLLECTION)
+    by_name = {}
+    for result in results:
+        by_name.setdefault(result[0], []).append(result)
+    for name, rows in by_name.items():
+        _, values, units, genders, dobs, report_datetimes = zip(*rows)
+        getattr(reference_collection.get(name), method)(
+            values, units=units, genders=genders, dobs=dobs,
+            report_datetimes=report_datetimes)
+
+
+def run(analytes=None, age_bands=None, count=None, repeat=None, genders=None):
+    """Runs each benchmark and returns a dictionary of
+    {name: {'n': ..., 'seconds': ..., 'us_per_op': ...}}.
+
+    See `make_collection_data` for `genders`.
+    """
+    normal_data, grading_data = make_collection_data(
+        analytes=analytes, age_bands=age_bands, genders=genders)
+    results = list(make_results(analytes=analytes, count=count))
+    reportables = Reportables()
+
+    def register():
+        Reportables().register(
+            name=COLLECTION, normal_data=normal_data, grading_data=grading_data)
+
+    references = sum(len(x) for x in normal_data.values()) + sum(
+        len(x) for x in grading_data.values())
+    phrases = [phrase.format(i) for i in range(250) for phrase in [
+        '13.{}<=x<=17.5', 'x<0.{}', '4{}<x', '1.25*ULN<=x<2.{}*ULN']]
+    path = mkdtemp()
+    benchmarks = {
+        'register': (register, references),
+        'parse': (lambda: _parse_all(phrases), len(phrases)),
+        'get_normal': (lambda: _evaluate(reportables, results, 'get_normal'), len(results)),
+        'get_grade': (lambda: _evaluate(reportables, results, 'get_grade'), len(results)),
+        'grade_stream': (
+            lambda: deque(reportables.get(COLLECTION).grade_stream(results), maxlen=0),
+            len(results)),
+        'to_csv': (lambda: reportables.to_csv(collection_name=COLLECTION, path=path),
+                   references),
+    }
+    if np is not None:
+        benchmarks.update({
+            'get_normal_many': (
+                lambda: _evaluate_many(reportables, results, 'get_normal_many'),
+                len(results)),
+            'get_grade_many': (
+                lambda: _evaluate_many(reportables, results, 'get_grade_many'),
+                len(results))})
+    reportables.register(
+        name=COLLECTION, normal_data=normal_data, grading_data=grading_data)
+    data = {}
+    for name, (func, n) in benchmarks.items():
+        seconds = _time(func, repeat=repeat)
+        data[name] = dict(n=n, seconds=seconds, us_per_op=seconds / n * 1e6)
+    for filename in os.listdir(path):
+        os.remove(os.path.join(path, filename))
+    os.rmdir(path)
+    return data
+
+
+def compare(baseline=None, current=None, tolerance=None):
+    """Returns a dictionary of {name: ratio} for each benchmark
+    slower than the baseline by more than `tolerance`.
+    """
+    tolerance = 0.1 if tolerance is None else tolerance
+    regressions = {}
+    for name, result in current.items():
+        try:
+            ratio = result['us_per_op'] / baseline[name]['us_per_op']
+        except KeyError:
+            continue
+        if ratio > 1 + tolerance:
+            regressions[name] = ratio
+    return regressions
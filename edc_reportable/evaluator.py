@@ -1,3 +1,4 @@
+import operator
 import re
 
 
@@ -22,6 +23,11 @@ class ValueBoundryError(Exception):
 
 
 class Evaluator:
+
+    __slots__ = ('name', 'lower', 'upper', 'units', 'lower_inclusive',
+                 'upper_inclusive', 'lower_operator', 'upper_operator',
+                 '_in_bounds')
+
     def __init__(self, name=None, lower=None, upper=None, units=None,
                  lower_inclusive=None, upper_inclusive=None, **kwargs):
         self.name = name
@@ -48,10 +54,20 @@ class Evaluator:
             None if not self.lower else '<=' if self.lower_inclusive is True else '<')
         self.upper_operator = (
             None if not self.upper else '<=' if self.upper_inclusive is True else '<')
+        self._in_bounds = self._compile()
 
     def __repr__(self):
         return f'{self.__class__.__name__}({self.description()})'
 
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in Evaluator.__slots__
+                if slot != '_in_bounds'}
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self._in_bounds = self._compile()
+
     def __str__(self):
         return self.description()
 
@@ -68,13 +84,68 @@ class Evaluator:
         return (f'{lower}{self.lower_operator or ""}{value}'
                 f'{self.upper_operator or ""}{upper} {self.units}')
 
+    @property
+    def boundaries(self):
+        """Returns a list of the values at which the result of
+        the bounds check may change.
+        """
+        return [bound for bound in (self.lower, self.upper) if bound] or [0.0]
+
+    def in_bounds(self, value, units=None, **kwargs):
+        """Returns True if the value is in bounds, otherwise False.
+
+        Units are only checked if given.
+        """
+        if units is not None and units != self.units:
+            raise InvalidUnits(f'Expected {self.units}. See {repr(self)}')
+        return self._in_bounds(float(value))
+
     def in_bounds_or_raise(self, value, units=None, **kwargs):
         value = float(value)
         if units != self.units:
             raise InvalidUnits(f'Expected {self.units}. See {repr(self)}')
-        condition = (
-            f'{self.lower or ""}{self.lower_operator or ""}{value}'
-            f'{self.upper_operator or ""}{self.upper or ""}')
-        if not eval(condition):
-            raise ValueBoundryError(condition)
+        if not self._in_bounds(value):
+            raise ValueBoundryError(self._condition(value))
         return True
+
+    def _condition(self, value):
+        return (f'{self.lower or ""}{self.lower_operator or ""}{value}'
+                f'{self.upper_operator or ""}{self.upper or ""}')
+
+    def _compile(self):
+        """Returns a predicate that evaluates a float against
+        the lower and upper bounds.
+
+        A falsy bound is ignored, as it is when building the
+        description. With neither bound the predicate is the
+        truthiness of the value.
+        """
+        lower, upper = self.lower, self.upper
+        lower_op, upper_op = self._operators()
+        if lower and upper:
+            return lambda value: lower_op(lower, value) and upper_op(value, upper)
+        elif lower:
+            return lambda value: lower_op(lower, value)
+        elif upper:
+            return lambda value: upper_op(value, upper)
+        return bool
+
+    def _operators(self):
+        lower_op = operator.le if self.lower_operator == '<=' else operator.lt
+        upper_op = operator.le if self.upper_operator == '<=' else operator.lt
+        return lower_op, upper_op
+
+    def in_bounds_mask(self, values):
+        """Returns a boolean array flagging which of a numpy
+        array of floats are in bounds.
+
+        Units are not checked.
+        """
+        lower_op, upper_op = self._operators()
+        if self.lower and self.upper:
+            return lower_op(self.lower, values) & upper_op(values, self.upper)
+        elif self.lower:
+            return lower_op(self.lower, values)
+        elif self.upper:
+            return upper_op(values, self.upper)
+        return values != 0
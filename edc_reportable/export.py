@@ -0,0 +1,98 @@
+from itertools import islice
+
+from .grade_reference import GradeReference
+from .normal_reference import NormalReference
+from .parsers import unparse
+from .value_reference_group import GRADING
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+ARROW_TYPES = {
+    'grade': 'int64',
+    'lower': 'float64',
+    'lower_inclusive': 'bool_',
+    'upper': 'float64',
+    'upper_inclusive': 'bool_',
+    'age_lower': 'float64',
+    'age_upper': 'float64',
+    'age_lower_inclusive': 'bool_',
+    'age_upper_inclusive': 'bool_'}
+
+
+def fieldnames(kind=None):
+    """Returns the export columns for normal or grading references.
+
+    The description, as written by `unparse`, is the second column.
+    """
+    fields = (GradeReference if kind == GRADING else NormalReference).fields
+    return [fields[0], 'description'] + list(fields[1:])
+
+
+def iter_rows(reference_collection, kind=None):
+    """Yields a list of values, in the order of `fieldnames`, for
+    each normal or grading reference in the collection.
+
+    References are not changed.
+    """
+    fields = (GradeReference if kind == GRADING else NormalReference).fields
+    for dct in reference_collection.iter_data(kind):
+        yield [dct[fields[0]], unparse(**dct)] + [dct[field] for field in fields[1:]]
+
+
+def arrow_schema(kind=None):
+    if pa is None:
+        raise ImportError('Arrow export requires pyarrow.')
+    return pa.schema([
+        (field, getattr(pa, ARROW_TYPES.get(field, 'string'))())
+        for field in fieldnames(kind)])
+
+
+def iter_record_batches(reference_collection, kind=None, batch_size=None):
+    """Yields pyarrow RecordBatches of up to `batch_size` (default
+    10000) references.
+    """
+    schema = arrow_schema(kind)
+    rows = iter_rows(reference_collection, kind)
+    batch = list(islice(rows, batch_size or 10000))
+    while batch:
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type)
+             for column, field in zip(zip(*batch), schema)], schema=schema)
+        batch = list(islice(rows, batch_size or 10000))
+
+
+def to_arrow(reference_collection, kind=None, batch_size=None):
+    """Returns a pyarrow Table of the normal or grading references.
+    """
+    if pa is None:
+        raise ImportError('Arrow export requires pyarrow.')
+    return pa.Table.from_batches(
+        list(iter_record_batches(reference_collection, kind, batch_size=batch_size)),
+        schema=arrow_schema(kind))
+
+
+def write_parquet(reference_collection, filename, kind=None, batch_size=None):
+    """Writes the normal or grading references to a Parquet file,
+    one batch at a time. Returns the number of references written.
+
+    The file is not written if there are no references of this kind.
+    """
+    if pa is None:
+        raise ImportError('Parquet export requires pyarrow.')
+    count = 0
+    writer = None
+    try:
+        for batch in iter_record_batches(reference_collection, kind, batch_size=batch_size):
+            if writer is None:
+                writer = pq.ParquetWriter(filename, batch.schema)
+            writer.write_batch(batch)
+            count += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
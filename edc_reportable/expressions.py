@@ -0,0 +1,152 @@
+from django.db.models import BooleanField, Case, F, IntegerField, Q, Value, When
+from django.db.models import DateTimeField
+from django.db.models.functions import ExtractDay, ExtractMonth, ExtractYear
+from functools import reduce
+from operator import or_
+from pytz import utc
+
+from .value_reference_group import ValueReferenceGroup
+
+
+class ExpressionError(Exception):
+    pass
+
+
+def age_annotations(dob='dob', report_datetime='report_datetime', alias='age'):
+    """Returns an ordered dictionary of annotations for the age in
+    whole years, as `alias`, at `report_datetime`.
+
+    `dob` and `report_datetime` are field names. `report_datetime`
+    may also be a datetime, e.g. for the age today.
+    """
+    if isinstance(report_datetime, str):
+        report_datetime = F(report_datetime)
+    else:
+        report_datetime = Value(report_datetime, output_field=DateTimeField())
+    dob = F(dob)
+    return {
+        f'{alias}_dob_md': ExtractMonth(dob) * 100 + ExtractDay(dob),
+        f'{alias}_report_md': (ExtractMonth(report_datetime, tzinfo=utc) * 100
+                               + ExtractDay(report_datetime, tzinfo=utc)),
+        alias: (ExtractYear(report_datetime, tzinfo=utc) - ExtractYear(dob) - Case(
+            When(**{f'{alias}_report_md__lt': F(f'{alias}_dob_md')}, then=Value(1)),
+            default=Value(0), output_field=IntegerField()))}
+
+
+def bounds_q(field, evaluator):
+    """Returns a Q object that is true where the value of
+    `field` is within the bounds of `evaluator`.
+
+    As for the evaluator, a falsy bound is ignored.
+    """
+    q = Q()
+    if evaluator.lower:
+        lookup = 'gte' if evaluator.lower_operator == '<=' else 'gt'
+        q &= Q(**{f'{field}__{lookup}': evaluator.lower})
+    if evaluator.upper:
+        lookup = 'lte' if evaluator.upper_operator == '<=' else 'lt'
+        q &= Q(**{f'{field}__{lookup}': evaluator.upper})
+    if not evaluator.lower and not evaluator.upper:
+        q = ~Q(**{field: 0})
+    return q
+
+
+class ExpressionCompiler:
+
+    """Compiles the references of a ValueReferenceGroup or
+    ReferenceCollection into Case(When(...)) expressions.
+
+    Arguments are the names of the fields, or annotations, for the
+    test name, value, units, gender and age in years. See
+    `age_annotations`.
+
+    Rows are graded against the group with the same test name.
+    Pass `name=None` to grade every row against a single group,
+    e.g. for a queryset already filtered on the test.
+
+    Values in units without a reference are not converted.
+    """
+
+    def __init__(self, references=None, name='name', value='value', units='units',
+                 gender='gender', age='age'):
+        if isinstance(references, ValueReferenceGroup):
+            self.groups = [references]
+        else:
+            references.warm()
+            self.groups = list(references.registry.values())
+        if name is None and len(self.groups) > 1:
+            raise ExpressionError(
+                'A field for the test name is required to compile more than one group.')
+        self.name = name
+        self.value = value
+        self.units = units
+        self.gender = gender
+        self.age = age
+
+    def grade(self):
+        """Returns a Case expression for the grade.
+
+        The grade is 0 if the value is evaluated but not graded and
+        NULL if there is no grading reference for the row.
+        """
+        whens = []
+        for grp in self.groups:
+            references = sorted(
+                (ref for refs in grp.grading.values() for ref in refs),
+                key=lambda ref: ref.grade, reverse=True)
+            whens.extend(self._whens(grp, references, lambda ref: ref.grade, 0))
+        return Case(*whens, default=Value(None), output_field=IntegerField())
+
+    def normal(self):
+        """Returns a Case expression that is True if the value is
+        normal.
+
+        The expression is False if the value is evaluated but not
+        normal and NULL if there is no normal reference for the row.
+        """
+        whens = []
+        for grp in self.groups:
+            references = [ref for refs in grp.normal.values() for ref in refs]
+            whens.extend(self._whens(grp, references, lambda ref: True, False))
+        return Case(*whens, default=Value(None), output_field=BooleanField())
+
+    def _whens(self, grp, references, result, otherwise):
+        if not references:
+            return []
+        name_q = Q() if self.name is None else Q(**{self.name: grp.name})
+        selected = [self._selected(ref) for ref in references]
+        whens = [
+            When(name_q & q & bounds_q(self.value, ref.evaluator), then=Value(result(ref)))
+            for ref, q in zip(references, selected)]
+        whens.append(When(name_q & reduce(or_, selected), then=Value(otherwise)))
+        return whens
+
+    def _selected(self, ref):
+        """Returns a Q object that selects rows for the units,
+        gender and age of a reference.
+        """
+        if ref.age_evaluator.units != 'years':
+            raise ExpressionError(
+                f'Only ages in years can be compiled. Got {repr(ref)} '
+                f'in {ref.age_evaluator.units}.')
+        return (Q(**{self.units: ref.units})
+                & Q(**{f'{self.gender}__in': list(ref.gender)})
+                & bounds_q(self.age, ref.age_evaluator))
+
+
+def annotate_grade(queryset, references, alias='grade', normal_alias=None, dob='dob',
+                   report_datetime='report_datetime', **kwargs):
+    """Returns the queryset annotated with the grade as `alias` and,
+    if `normal_alias` is given, whether the value is normal.
+
+    The age is annotated as `{alias}_age`. `kwargs` are the field
+    names passed to ExpressionCompiler.
+    """
+    age = f'{alias}_age'
+    compiler = ExpressionCompiler(references, age=age, **kwargs)
+    queryset = queryset.annotate(
+        **age_annotations(dob=dob, report_datetime=report_datetime, alias=age))
+    annotations = {alias: compiler.grade()}
+    if normal_alias:
+        annotations.update({normal_alias: compiler.normal()})
+    return queryset.annotate(**annotations)
@@ -1,3 +1,6 @@
+from math import inf
+
+from .parsers import unparse, ULN
 from .value_reference import ValueReference
 
 GRADE1 = '1'
@@ -13,17 +16,104 @@ class GradeError(Exception):
 
 class GradeReference(ValueReference):
 
+    """A reference range for a grade.
+
+    A bound may be a multiple of the upper or lower limit of
+    normal (ULN or LLN), e.g. lower=1.25, lower_relative=ULN.
+    A relative reference cannot evaluate a value until
+    compiled against a normal reference with `resolve`.
+    """
+
     grades = [GRADE1, GRADE2, GRADE3, GRADE4, GRADE5]
 
-    def __init__(self, grade=None, **kwargs):
+    fields = ('grade', ) + ValueReference.fields
+
+    __slots__ = ('grade', 'lower_relative', 'upper_relative')
+
+    def __init__(self, grade=None, lower_relative=None, upper_relative=None, **kwargs):
         if int(grade) not in [int(x) for x in self.grades]:
             raise GradeError(
                 f'Invalid grade. Expected one of {self.grades}. Got {grade}.')
-        self.grade = int(grade)
+        self._set(lower_relative=lower_relative, upper_relative=upper_relative)
         super().__init__(**kwargs)
+        self._set(grade=int(grade))
 
     def __repr__(self):
         return (f'{super().__repr__()} GRADE {self.grade})')
 
+    @property
+    def relative(self):
+        return bool(self.lower_relative or self.upper_relative)
+
     def description(self, **kwargs):
+        if self.relative:
+            bounds = unparse(
+                lower=self.lower, lower_inclusive=self.lower_inclusive,
+                lower_relative=self.lower_relative, upper=self.upper,
+                upper_inclusive=self.upper_inclusive,
+                upper_relative=self.upper_relative)
+            return f'{bounds} {self.units} GRADE {self.grade}'
         return f'{self.evaluator.description(**kwargs)} GRADE {self.grade}'
+
+    def convert(self, units=None, factor=None):
+        """Returns a new GradeReference as for ValueReference.
+
+        Relative bounds are multiples of the ULN or LLN and are
+        not converted.
+        """
+        kwargs = self.as_dict()
+        kwargs.update(lower_relative=self.lower_relative,
+                      upper_relative=self.upper_relative)
+        for bound in ['lower', 'upper']:
+            if kwargs[bound] is not None and not kwargs[f'{bound}_relative']:
+                kwargs[bound] = round(float(kwargs[bound]) * factor, 10)
+        kwargs.update(units=units)
+        return self.__class__(**kwargs)
+
+    def resolve(self, normal_reference):
+        """Returns a new GradeReference with the ULN or LLN of
+        `normal_reference` applied to the relative bounds, or None
+        if the genders or age ranges do not overlap.
+
+        The new reference is limited to the genders and age
+        range common to both.
+        """
+        gender = ''.join(
+            x for x in (self.gender or normal_reference.gender)
+            if x in normal_reference.gender)
+        ages = _common_ages(self, normal_reference)
+        if not gender or not ages:
+            return None
+        kwargs = self.as_dict()
+        for bound in ['lower', 'upper']:
+            relative = getattr(self, f'{bound}_relative')
+            if relative:
+                limit = (normal_reference.upper if relative == ULN
+                         else normal_reference.lower)
+                if limit is None:
+                    raise GradeError(
+                        f'Unable to resolve {self.description()}. '
+                        f'Normal reference has no {relative}. '
+                        f'Got {repr(normal_reference)}.')
+                kwargs[bound] = round(float(kwargs[bound]) * float(limit), 10)
+        kwargs.update(gender=gender, **ages)
+        return self.__class__(**kwargs)
+
+
+def _common_ages(ref1, ref2):
+    """Returns a dictionary of the age bounds common to both
+    references or None.
+    """
+    if (ref1.age_units or 'years') != (ref2.age_units or 'years'):
+        return None
+    lower, lower_exclusive = max(
+        (ref.age_lower or 0, not ref.age_lower_inclusive) for ref in [ref1, ref2])
+    upper, upper_inclusive = min(
+        (ref.age_upper or inf, bool(ref.age_upper_inclusive)) for ref in [ref1, ref2])
+    if lower > upper or (lower == upper and (lower_exclusive or not upper_inclusive)):
+        return None
+    return dict(
+        age_lower=lower, age_lower_inclusive=not lower_exclusive or None,
+        age_upper=None if upper == inf else upper,
+        age_upper_inclusive=upper_inclusive or None,
+        age_units=ref1.age_units)
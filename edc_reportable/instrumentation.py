@@ -0,0 +1,160 @@
+import logging
+
+from bisect import bisect_left
+from collections import namedtuple
+from itertools import count
+from threading import Lock, local
+from time import perf_counter
+
+from .value_reference_group import BoundariesOverlap, NotEvaluated, GRADING, NORMAL
+
+ERROR = 'error'
+MATCH = 'match'
+NO_MATCH = 'no_match'
+NOT_EVALUATED = 'not_evaluated'
+OVERLAP = 'overlap'
+REGISTER = 'register'
+
+# upper bounds, in microseconds, of the latency histogram buckets
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+INSTRUMENTED = ('get_normal', 'get_grade', '_get_references')
+
+Event = namedtuple(
+    'Event', 'collection name kind outcome candidates seconds')
+Event.__doc__ = """An evaluation or registration.
+
+`candidates` is the number of references selected for the value's
+gender, age and units. `seconds` is None unless the call was sampled.
+"""
+
+
+class InMemorySink:
+
+    """Aggregates events into counters and latency histograms
+    by collection, test name and kind.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            stats = self._data.setdefault(
+                event.collection, {}).setdefault(
+                    event.name, {}).setdefault(event.kind, self._new_stats())
+            stats['calls'] += 1
+            stats['candidates'] += event.candidates or 0
+            if event.outcome == MATCH:
+                stats['matches'] += 1
+            else:
+                stats['misses'][event.outcome] = stats['misses'].get(event.outcome, 0) + 1
+            if event.seconds is not None:
+                stats['sampled'] += 1
+                stats['latency'][bisect_left(LATENCY_BUCKETS, event.seconds * 1e6)] += 1
+
+    @staticmethod
+    def _new_stats():
+        return dict(calls=0, candidates=0, matches=0, misses={}, sampled=0,
+                    latency=[0] * (len(LATENCY_BUCKETS) + 1))
+
+    def snapshot(self):
+        """Returns a copy of the statistics as nested dictionaries of
+        {collection: {name: {kind: stats}}}.
+
+        `latency` is a dictionary of {bucket upper bound in us: count}.
+        """
+        labels = [str(bound) for bound in LATENCY_BUCKETS] + ['inf']
+        with self._lock:
+            return {
+                collection: {
+                    name: {
+                        kind: dict(stats, misses=dict(stats['misses']),
+                                   latency=dict(zip(labels, stats['latency'])))
+                        for kind, stats in kinds.items()}
+                    for name, kinds in names.items()}
+                for collection, names in self._data.items()}
+
+    def reset(self):
+        with self._lock:
+            self._data = {}
+
+
+class LoggingSink:
+
+    """Logs each event.
+    """
+
+    def __init__(self, logger=None, level=None):
+        self.logger = logger or logging.getLogger('edc_reportable')
+        self.level = logging.DEBUG if level is None else level
+
+    def __call__(self, event):
+        self.logger.log(self.level, '%s', event)
+
+
+class CallbackSink:
+
+    """Passes each event to a callable.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def __call__(self, event):
+        self.callback(event)
+
+
+def instrument(grp, sink, sample_every=None, collection=None):
+    """Sends an Event to `sink` for each call to `get_normal` and
+    `get_grade` on this group.
+
+    One call in `sample_every` (default 100) is timed.
+
+    The wrappers are set on the instance so that a group that is
+    not instrumented runs the class methods unchanged.
+    """
+    uninstrument(grp)
+    sample_every = sample_every or 100
+    state = local()
+    get_references = grp._get_references
+
+    def _get_references(**kwargs):
+        references = get_references(**kwargs)
+        state.candidates = len(references)
+        return references
+
+    def wrap(kind, method):
+        calls = count()
+
+        def wrapper(value=None, units=None, **kwargs):
+            state.candidates = None
+            outcome = ERROR
+            start = perf_counter() if not next(calls) % sample_every else None
+            try:
+                result = method(value=value, units=units, **kwargs)
+            except NotEvaluated:
+                outcome = NOT_EVALUATED
+                raise
+            except BoundariesOverlap:
+                outcome = OVERLAP
+                raise
+            else:
+                outcome = NO_MATCH if result is None else MATCH
+                return result
+            finally:
+                sink(Event(collection, grp.name, kind, outcome, state.candidates,
+                           None if start is None else perf_counter() - start))
+        return wrapper
+
+    grp._get_references = _get_references
+    grp.get_normal = wrap(NORMAL, grp.get_normal)
+    grp.get_grade = wrap(GRADING, grp.get_grade)
+
+
+def uninstrument(grp):
+    """Restores the class methods on the group.
+    """
+    for attr in INSTRUMENTED:
+        grp.__dict__.pop(attr, None)
@@ -0,0 +1,134 @@
+import json
+import os
+
+from django.apps import apps as django_apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from itertools import islice
+
+from ...site_reportables import site_reportables
+
+
+class Command(BaseCommand):
+
+    help = ('Grades the rows of a model with a registered reference collection '
+            'and saves the grades that changed.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help='app_label.model_name')
+        parser.add_argument('--collection', required=True,
+                            help='name of a registered reference collection')
+        parser.add_argument('--name-field', default='name')
+        parser.add_argument('--value-field', default='value')
+        parser.add_argument('--units-field', default='units')
+        parser.add_argument('--gender-field', default='gender')
+        parser.add_argument('--dob-field', default='dob')
+        parser.add_argument('--report-datetime-field', default='report_datetime')
+        parser.add_argument('--grade-field', default='grade')
+        parser.add_argument('--normal-field', default=None,
+                            help='also save whether the value is normal to this field')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--checkpoint', default=None,
+                            help='file to record progress in, to resume an interrupted run')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='list the changes without saving them')
+        parser.add_argument('--clear-errors', action='store_true',
+                            help='clear the saved grade of rows that are not evaluated')
+
+    def handle(self, *args, **options):
+        try:
+            model_cls = django_apps.get_model(options['model'])
+        except (LookupError, ValueError) as e:
+            raise CommandError(e)
+        reference_collection = site_reportables.get(options['collection'])
+        if reference_collection is None:
+            raise CommandError(f'Reference collection not found. Got {options["collection"]}.')
+        update_fields = [options['grade_field']]
+        if options['normal_field']:
+            update_fields.append(options['normal_field'])
+        checkpoint = Checkpoint(
+            options['checkpoint'], model=model_cls._meta.label_lower,
+            collection=reference_collection.name)
+        queryset = model_cls.objects.order_by('pk')
+        if checkpoint.last_pk is not None:
+            queryset = queryset.filter(pk__gt=checkpoint.last_pk)
+        rows = queryset.values_list(
+            'pk', options['name_field'], options['value_field'], options['units_field'],
+            options['gender_field'], options['dob_field'],
+            options['report_datetime_field'], *update_fields).iterator(
+                chunk_size=options['chunk_size'])
+        counts = dict(rows=0, changed=0, errors=0)
+        for chunk in chunks(rows, options['chunk_size']):
+            changed = self.regrade(
+                model_cls, reference_collection, chunk, update_fields, counts, options)
+            if not options['dry_run']:
+                with transaction.atomic():
+                    model_cls.objects.bulk_update(changed, update_fields)
+                checkpoint.save(chunk[-1][0])
+        if not options['dry_run']:
+            checkpoint.remove()
+        self.stdout.write(
+            f'{"Would change" if options["dry_run"] else "Changed"} {counts["changed"]} '
+            f'of {counts["rows"]} rows. {counts["errors"]} rows not evaluated'
+            f'{", cleared" if options["clear_errors"] else ", left unchanged"}.')
+
+    def regrade(self, model_cls, reference_collection, chunk, update_fields, counts,
+                options):
+        """Returns a list of model instances, with just the pk and
+        update fields set, for the rows in the chunk that changed.
+        """
+        changed = []
+        results = reference_collection.grade_stream(
+            (row[1:7] for row in chunk), normal=len(update_fields) > 1)
+        for row, result in zip(chunk, results):
+            counts['rows'] += 1
+            if result.error:
+                counts['errors'] += 1
+                if options['verbosity'] > 1:
+                    self.stderr.write(f'{row[0]}: {result.error}')
+                if not options['clear_errors']:
+                    continue
+            new = (result.grade, result.normal)[:len(update_fields)]
+            if tuple(row[7:]) != new:
+                counts['changed'] += 1
+                if options['dry_run']:
+                    self.stdout.write(f'{row[0]}: {tuple(row[7:])} -> {new}')
+                changed.append(model_cls(pk=row[0], **dict(zip(update_fields, new))))
+        return changed
+
+
+class Checkpoint:
+
+    """The pk of the last row saved, in a JSON file.
+    """
+
+    def __init__(self, filename=None, model=None, collection=None):
+        self.filename = filename
+        self.data = dict(model=model, collection=collection)
+        self.last_pk = None
+        if filename and os.path.exists(filename):
+            with open(filename) as f:
+                data = json.load(f)
+            if (data.get('model'), data.get('collection')) != (model, collection):
+                raise CommandError(
+                    f'Checkpoint {filename} is for {data.get("model")} and '
+                    f'{data.get("collection")}. Remove it to start again.')
+            self.last_pk = data['last_pk']
+
+    def save(self, last_pk):
+        if self.filename:
+            with open(f'{self.filename}.tmp', 'w') as f:
+                json.dump(dict(self.data, last_pk=last_pk), f)
+            os.replace(f'{self.filename}.tmp', self.filename)
+
+    def remove(self):
+        if self.filename and os.path.exists(self.filename):
+            os.remove(self.filename)
+
+
+def chunks(rows, chunk_size):
+    rows = iter(rows)
+    chunk = list(islice(rows, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(rows, chunk_size))
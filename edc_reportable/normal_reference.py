@@ -2,4 +2,5 @@ from .value_reference import ValueReference
 
 
 class NormalReference(ValueReference):
-    pass
+
+    __slots__ = ()
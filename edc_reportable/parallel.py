@@ -0,0 +1,90 @@
+import os
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+
+from .streaming import grade_stream
+from .value_reference_group import NotEvaluated
+
+# the collection in this worker process, set by `_init_worker`
+_reference_collection = None
+
+
+def _init_worker(reference_collection):
+    global _reference_collection
+    _reference_collection = reference_collection
+
+
+def grade_chunk(reference_collection, records, normal=None):
+    """Returns a list of a GradeResult for each record.
+    """
+    return list(grade_stream(reference_collection, records, normal=normal))
+
+
+def _grade_chunk_in_worker(records, normal=None):
+    return grade_chunk(_reference_collection, records, normal=normal)
+
+
+def _chunks(records, chunk_size):
+    records = iter(records)
+    chunk = list(islice(records, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(records, chunk_size))
+
+
+def _map_ordered(executor, func, chunks, window):
+    """Yields the result of `func` for each chunk, in order, with
+    at most `window` chunks submitted and not yet yielded.
+    """
+    futures = deque()
+    for chunk in chunks:
+        futures.append(executor.submit(func, chunk))
+        if len(futures) >= window:
+            yield futures.popleft().result()
+    while futures:
+        yield futures.popleft().result()
+
+
+def grade_parallel(reference_collection, records, chunk_size=None, max_workers=None,
+                   raise_errors=None, normal=None):
+    """Returns a list of a GradeResult for each record of
+    (name, value, units, gender, dob, report_datetime), in order.
+
+    Records are graded in chunks of `chunk_size` (default 1000)
+    by a pool of `max_workers` processes (default, one per CPU).
+    The collection is sent to each worker once. With one
+    worker, records are graded in this process.
+
+    If `raise_errors` is True, raises NotEvaluated for the first
+    record, by position, that was not evaluated.
+
+    If `normal` is True, values are also checked against the
+    normal references. See `streaming.grade_stream`.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    reference_collection.warm()
+    chunks = _chunks(records, chunk_size or 1000)
+    if max_workers == 1:
+        return _flatten(
+            (grade_chunk(reference_collection, chunk, normal=normal) for chunk in chunks),
+            raise_errors)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(reference_collection, )) as executor:
+        return _flatten(
+            _map_ordered(executor, partial(_grade_chunk_in_worker, normal=normal),
+                         chunks, window=max_workers * 2),
+            raise_errors)
+
+
+def _flatten(chunk_results, raise_errors):
+    results = []
+    for chunk in chunk_results:
+        if raise_errors:
+            for index, result in enumerate(chunk, len(results)):
+                if result.error:
+                    raise NotEvaluated(f'Record {index}. {result.error}')
+        results.extend(chunk)
+    return results
@@ -1,6 +1,23 @@
 import re
 
 from collections import OrderedDict
+from edc_constants.constants import FEMALE, MALE
+from functools import lru_cache
+
+
+ULN = 'ULN'
+LLN = 'LLN'
+
+number = r'\d*\.?\d+'
+
+phrase_pattern = re.compile(
+    rf'\s*(?:(?P<lower>{number})(?:\*(?P<lower_relative>{ULN}|{LLN}))?'
+    rf'\s*(?P<lower_op><=?)\s*)?x'
+    rf'(?:\s*(?P<upper_op><=?)\s*'
+    rf'(?P<upper>{number})(?:\*(?P<upper_relative>{ULN}|{LLN}))?)?'
+    rf'(?:\s+(?P<gender>[{MALE}{FEMALE}]+))?'
+    rf'(?:\s+(?P<age>(?:(?P<age_lower>{number})\s*(?P<age_lower_op><=?)\s*)?AGE'
+    rf'(?:\s*(?P<age_upper_op><=?)\s*(?P<age_upper>{number}))?))?\s*$')
 
 
 class ParserError(Exception):
@@ -11,13 +28,17 @@ def unparse(**kwargs):
 
     lower = kwargs.get('lower') or ''
     upper = kwargs.get('upper') or ''
+    if lower and kwargs.get('lower_relative'):
+        lower = f'{lower}*{kwargs.get("lower_relative")}'
+    if upper and kwargs.get('upper_relative'):
+        upper = f'{upper}*{kwargs.get("upper_relative")}'
     lower_op = (
         '' if not lower else '<=' if kwargs.get('lower_inclusive') else '<')
     upper_op = (
         '' if not upper else '<=' if kwargs.get('upper_inclusive') else '<')
-    gender = kwargs.get('gender', '')
-    age_lower = kwargs.get('age_lower', '')
-    age_upper = kwargs.get('age_upper', '')
+    gender = kwargs.get('gender') or ''
+    age_lower = kwargs.get('age_lower') or ''
+    age_upper = kwargs.get('age_upper') or ''
     age_lower_op = (
         '' if not age_lower
         else '<=' if kwargs.get('age_lower_inclusive') else '<')
@@ -29,32 +50,84 @@ def unparse(**kwargs):
     return (f'{lower}{lower_op}x{upper_op}{upper} {gender} {age}'.rstrip())
 
 
-def parse(phrase=None, **kwargs):
+def _to_float(bound):
+    return None if bound is None else float(bound)
+
+
+def _to_age(bound):
+    if bound is None:
+        return None
+    return int(bound) if bound.isdigit() else float(bound)
+
+
+def _inclusive(operator):
+    return True if operator == '<=' else None
 
-    pattern = '(([\d+\.\d+]|[\.\d+])?(<|<=)?)+x((<|<=)?([\d+\.\d+]|[\.\d+])+)?'
-
-    def _parse(string):
-        inclusive = True if '=' in string else None
-        try:
-            value = float(string.replace('<', '').replace('=', ''))
-        except ValueError:
-            value = None
-        return value, inclusive
-    phrase = phrase.replace(' ', '')
-    match = re.match(pattern, phrase)
-    if not match or match.group() != phrase:
+
+@lru_cache(maxsize=1024)
+def _parse(phrase):
+    """Returns a tuple of (key, value) pairs for a phrase or
+    raises ParserError.
+    """
+    match = phrase_pattern.match(phrase)
+    if not match:
         raise ParserError(
             f'Invalid. Got {phrase}. Expected, e.g, 11<x<22, '
-            f'11<=x<22, 11<x<=22, 11<x, 11<=x, x<22, x<=22, etc.')
-    left, right = phrase.replace(' ', '').split('x')
-    lower, lower_inclusive = _parse(left)
-    upper, upper_inclusive = _parse(right)
-    ret = OrderedDict(
-        lower=lower,
-        lower_inclusive=lower_inclusive,
-        upper=upper,
-        upper_inclusive=upper_inclusive,
-        **kwargs)
+            f'11<=x<22, 11<x<=22, 11<x, 11<=x, x<22, x<=22, 1.25*ULN<=x, '
+            f'11<=x<22 M 18<=AGE<65, etc.')
+    items = [
+        ('lower', _to_float(match.group('lower'))),
+        ('lower_inclusive', _inclusive(match.group('lower_op'))),
+        ('upper', _to_float(match.group('upper'))),
+        ('upper_inclusive', _inclusive(match.group('upper_op')))]
+    if match.group('lower_relative') or match.group('upper_relative'):
+        items.extend([('lower_relative', match.group('lower_relative')),
+                      ('upper_relative', match.group('upper_relative'))])
+    if match.group('gender'):
+        items.append(('gender', match.group('gender')))
+    if match.group('age'):
+        items.extend([
+            ('age_lower', _to_age(match.group('age_lower'))),
+            ('age_lower_inclusive', _inclusive(match.group('age_lower_op'))),
+            ('age_upper', _to_age(match.group('age_upper'))),
+            ('age_upper_inclusive', _inclusive(match.group('age_upper_op')))])
+    return tuple(items)
+
+
+def parse(phrase=None, **kwargs):
+    """Returns an ordered dictionary of bounds for a phrase
+    like 11<=x<22.
+
+    A bound may be a multiple of the upper or lower limit of
+    normal, e.g. 1.25*ULN<=x<2.5*ULN. If so, `lower_relative`
+    and `upper_relative` are included.
+
+    The phrase may be followed by the gender and age bounds,
+    as written by `unparse`, e.g. 11<=x<22 M 18<=AGE<65. If so,
+    `gender` and the age bounds are included. Keyword arguments
+    take precedence over the phrase.
+    """
+    ret = OrderedDict(_parse(phrase))
+    ret.update(**kwargs)
     for k, v in ret.items():
         setattr(ret, k, v)
     return ret
+
+
+def parse_many(lines=None, **kwargs):
+    """Returns a list of the result of `parse` for each line in
+    a block of text or an iterable of lines.
+
+    Blank lines and lines starting with # are skipped.
+    """
+    if isinstance(lines, str):
+        lines = lines.splitlines()
+    parsed = []
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            try:
+                parsed.append(parse(line, **kwargs))
+            except ParserError as e:
+                raise ParserError(f'Line {line_number}. {e}') from e
+    return parsed
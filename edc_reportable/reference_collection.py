@@ -1,3 +1,11 @@
+from threading import RLock
+from types import MappingProxyType
+
+from .instrumentation import instrument, uninstrument
+from .parallel import grade_parallel
+from .streaming import agrade_stream, grade_stream
+from .value_reference_group import BoundariesOverlap, GRADING, NORMAL
+
 
 class AlreadyRegistered(Exception):
     pass
@@ -9,45 +17,212 @@ class ReferenceCollection:
 
     Usually there is just one reference collection per project so
     name can be the project name.
+
+    A group may be registered with `register_lazy` as a callable
+    that builds the group. The group is built and validated the
+    first time it is requested with `get`, or by `warm`.
+
+    `registry` is a read-only mapping that is never changed. Adding
+    a group replaces it with a new mapping, so readers need no lock.
     """
 
     def __init__(self, name=None):
-        self.registry = {}
+        self.registry = MappingProxyType({})
         self.name = name
+        self._pending = {}
+        self._options = {}
+        self._lock = RLock()
 
     def __repr__(self):
         return f'{self.__class__.__name__}(\'{self.name}\')'
 
+    def __getstate__(self):
+        """Drops the lock and instrumentation, which are per process.
+        """
+        state = self.__dict__.copy()
+        state.update(registry=dict(self.registry), _lock=None, _options={
+            k: v for k, v in self._options.items() if k != 'instrumentation'})
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.registry = MappingProxyType(self.registry)
+        self._lock = RLock()
+
+    def copy(self, groups=True):
+        """Returns a new collection with the same groups, pending
+        groups and options.
+
+        Groups are shared, not copied. If `groups` is False, only
+        the options are copied.
+        """
+        reference_collection = self.__class__(name=self.name)
+        with self._lock:
+            if groups:
+                reference_collection.registry = self.registry
+                reference_collection._pending = dict(self._pending)
+            reference_collection._options = dict(self._options)
+        return reference_collection
+
     def register(self, grp=None):
-        if grp.name in self.registry:
-            raise AlreadyRegistered(f'Got {repr(grp)}')
-        else:
-            self.registry.update({grp.name: grp})
+        with self._lock:
+            if grp.name in self.registry or grp.name in self._pending:
+                raise AlreadyRegistered(f'Got {repr(grp)}')
+            self._configure(grp)
+            self._swap(grp)
+
+    def register_lazy(self, name=None, build=None):
+        """Registers a callable that returns the group for `name`.
+        """
+        with self._lock:
+            if name in self.registry or name in self._pending:
+                raise AlreadyRegistered(f'Got {name}')
+            self._pending.update({name: build})
 
     def get(self, name):
-        return self.registry.get(name)
+        try:
+            return self.registry[name]
+        except KeyError:
+            if name not in self._pending:
+                return self.registry.get(name)
+            return self._compile(name)
+
+    @property
+    def built(self):
+        """True if every group registered is built.
+        """
+        return not self._pending
+
+    def warm(self):
+        """Builds and validates every group not yet built.
+        """
+        for name in list(self._pending):
+            self._compile(name)
+
+    def _compile(self, name):
+        """Returns the group for `name`, building it if pending,
+        or None.
+
+        Only one thread builds a group. The group is added to the
+        registry once validated and configured.
+        """
+        with self._lock:
+            if name in self.registry:
+                return self.registry[name]
+            try:
+                build = self._pending[name]
+            except KeyError:
+                return None
+            grp = build()
+            grp.validate()
+            self._configure(grp)
+            self._swap(grp)
+            del self._pending[name]
+        return grp
+
+    def _configure(self, grp):
+        """Applies the cache and instrumentation enabled on the
+        collection to a group.
+        """
+        if 'cache' in self._options:
+            grp.enable_cache(maxsize=self._options['cache'])
+        if 'instrumentation' in self._options:
+            sink, sample_every = self._options['instrumentation']
+            instrument(grp, sink, sample_every=sample_every, collection=self.name)
 
     def update_grp(self, grp):
-        self.registry.update({grp.name: grp})
+        with self._lock:
+            self._configure(grp)
+            self._swap(grp)
+            self._pending.pop(grp.name, None)
+
+    def _swap(self, grp):
+        """Replaces the registry with a new mapping that includes `grp`.
+        """
+        self.registry = MappingProxyType({**self.registry, grp.name: grp})
+
+    def validate(self):
+        """Checks every group for overlapping references and raises
+        BoundariesOverlap listing all of them.
+
+        Groups not yet built are built first.
+        """
+        self.warm()
+        registry = self.registry
+        overlaps = []
+        for grp in registry.values():
+            overlaps.extend(grp.get_overlaps())
+        if overlaps:
+            raise BoundariesOverlap(
+                'Check your definitions. ' + '; '.join(overlaps))
+        for grp in registry.values():
+            grp.validated = True
+
+    def enable_cache(self, maxsize=None):
+        """Enables a result cache on each group in the collection.
+        """
+        self._options.update(cache=maxsize)
+        for grp in self.registry.values():
+            grp.enable_cache(maxsize=maxsize)
+
+    def enable_instrumentation(self, sink=None, sample_every=None):
+        """Instruments each group in the collection.
+
+        See `instrumentation.instrument`.
+        """
+        self._options.update(instrumentation=(sink, sample_every))
+        for grp in self.registry.values():
+            instrument(grp, sink, sample_every=sample_every, collection=self.name)
+
+    def disable_instrumentation(self):
+        self._options.pop('instrumentation', None)
+        for grp in self.registry.values():
+            uninstrument(grp)
+
+    def grade_stream(self, records, normal=None):
+        """Yields a GradeResult for each record.
+
+        See `streaming.grade_stream`.
+        """
+        return grade_stream(self, records, normal=normal)
+
+    def agrade_stream(self, records, normal=None, yield_every=None):
+        """Yields a GradeResult for each record in an iterable or
+        async iterable.
+
+        See `streaming.agrade_stream`.
+        """
+        return agrade_stream(self, records, normal=normal, yield_every=yield_every)
+
+    def grade_parallel(self, records, chunk_size=None, max_workers=None,
+                       raise_errors=None, normal=None):
+        """Returns a list of a GradeResult for each record, graded
+        by a pool of processes.
+
+        See `parallel.grade_parallel`.
+        """
+        return grade_parallel(
+            self, records, chunk_size=chunk_size, max_workers=max_workers,
+            raise_errors=raise_errors, normal=normal)
+
+    def iter_data(self, kind=None):
+        """Yields a new dictionary of the fields of each normal
+        reference or, if `kind` is 'grading', each grading reference.
+
+        References are not changed.
+        """
+        self.warm()
+        for grp in self.registry.values():
+            for refs in (grp.grading if kind == GRADING else grp.normal).values():
+                for ref in refs:
+                    yield ref.as_dict()
 
     def as_data(self):
         """Returns a dictionary of the normal and grading references
         in this collection.
         """
-        exclude_attrs = ['evaluator', 'age_evaluator']
-        data = {'normal': [], 'grading': []}
-        for name, grp in self.registry.items():
-            for normal_refs in grp.normal.values():
-                for ref in normal_refs:
-                    dct = ref.__dict__
-                    dct.update(name=name)
-                    dct = {k: v for k, v in dct.items() if k not in exclude_attrs}
-                    data['normal'].append(dct)
-        for name, grp in self.registry.items():
-            for grade_refs in grp.grading.values():
-                for ref in grade_refs:
-                    dct = ref.__dict__
-                    dct.update(name=name)
-                    dct = {k: v for k, v in dct.items() if k not in exclude_attrs}
-                    data['grading'].append(dct)
-        return data
+        self.warm()
+        # a copy shares one registry for both kinds
+        reference_collection = self.copy()
+        return {NORMAL: list(reference_collection.iter_data(NORMAL)),
+                GRADING: list(reference_collection.iter_data(GRADING))}
@@ -0,0 +1,223 @@
+from bisect import bisect_left
+from math import inf
+
+# the approximate length in days of each age unit, to compare
+# age ranges declared in different units
+DAYS = {'years': 365.25, 'months': 30.4375, 'weeks': 7, 'days': 1, 'hours': 1 / 24}
+
+
+class AgeTable:
+
+    """Selects references by age for a single age unit.
+
+    The age axis is split into regions at the age boundaries of
+    the references; each boundary is a region and so is each
+    open interval between boundaries. The references for each
+    region are selected once when the table is built.
+    """
+
+    def __init__(self, age_units=None, references=None):
+        self.age_units = age_units
+        self.boundaries = sorted(
+            {bound for ref in references for bound in ref.age_evaluator.boundaries})
+        self.regions = tuple(
+            tuple(ref for ref in references if ref.age_evaluator._in_bounds(age))
+            for age in self._representative_ages())
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.age_units}, {self.boundaries})'
+
+    def get(self, age):
+        """Returns a tuple of references for this age.
+        """
+        return self.regions[self.region(age)]
+
+    def region(self, age):
+        """Returns the index of the region that contains this age.
+        """
+        index = bisect_left(self.boundaries, age)
+        if index < len(self.boundaries) and self.boundaries[index] == age:
+            return 2 * index + 1
+        return 2 * index
+
+    def _representative_ages(self):
+        """Yields one age from each region, in order.
+        """
+        boundaries = self.boundaries
+        for index, boundary in enumerate(boundaries):
+            if index == 0:
+                yield boundary - 1
+            else:
+                yield (boundaries[index - 1] + boundary) / 2
+            yield boundary
+        yield boundaries[-1] + 1
+
+
+class ReferenceIndex:
+
+    """An index of value references keyed by (units, gender).
+
+    Each key holds an AgeTable for each age unit so that the
+    references for a subject are found with a bisect on age.
+    A reference declared for gender 'MF' is indexed under 'M',
+    'F' and 'MF'.
+
+    If `sort_key` is given, the references for each age region
+    are kept sorted on it.
+    """
+
+    def __init__(self, sort_key=None, reverse=None):
+        self.sort_key = sort_key
+        self.reverse = reverse
+        self.units = set()
+        self._references = {}
+        self._tables = {}
+        self._dirty = set()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({list(self._references)})'
+
+    def add(self, reference):
+        """Adds a reference.
+
+        The tables for its keys are rebuilt on the next lookup so
+        that adding n references does not build n tables.
+        """
+        self.units.add(reference.units)
+        for key in self._keys(reference):
+            self._references.setdefault(key, []).append(reference)
+            self._dirty.add(key)
+
+    def get(self, units=None, gender=None, rdelta=None):
+        """Returns a tuple of references for these units and gender
+        where the age, as a relativedelta, is in the age range.
+        """
+        if self._dirty:
+            self._refresh()
+        tables = self._tables.get((units, gender))
+        if not tables:
+            return ()
+        if len(tables) == 1:
+            table = tables[0]
+            return table.get(getattr(rdelta, table.age_units))
+        return tuple(
+            ref for table in tables
+            for ref in table.get(getattr(rdelta, table.age_units)))
+
+    def bucket(self, units=None, gender=None, rdelta=None):
+        """Returns a hashable value that is equal for any two ages
+        that select the same references, or None.
+        """
+        if self._dirty:
+            self._refresh()
+        tables = self._tables.get((units, gender))
+        if not tables:
+            return None
+        return tuple(
+            table.region(getattr(rdelta, table.age_units)) for table in tables)
+
+    def overlaps(self):
+        """Returns a list of (reference, reference) tuples for each
+        pair of references that share units, gender and age but
+        have overlapping value ranges.
+
+        Within each age region the value ranges are sorted on their
+        lower bound and swept once, keeping a list of the ranges
+        still open. References with ages in different units are
+        compared pairwise, with ages converted to days.
+        """
+        if self._dirty:
+            self._refresh()
+        pairs = {}
+        for tables in self._tables.values():
+            for table in tables:
+                for references in table.regions:
+                    for pair in self._sweep(references):
+                        pairs.setdefault(tuple(id(ref) for ref in pair), pair)
+            for index, table in enumerate(tables):
+                for other in tables[index + 1:]:
+                    for pair in self._compare_ages(table, other):
+                        pairs.setdefault(tuple(id(ref) for ref in pair), pair)
+        return list(pairs.values())
+
+    @staticmethod
+    def _compare_ages(table, other):
+        """Yields each pair of references, one from each table, with
+        overlapping ages and value ranges.
+        """
+        if table.age_units not in DAYS or other.age_units not in DAYS:
+            return
+        others = list(dict.fromkeys(ref for refs in other.regions for ref in refs))
+        for ref in dict.fromkeys(ref for refs in table.regions for ref in refs):
+            age = _days(ref.age_evaluator)
+            for other_ref in others:
+                if (_overlap(age, _days(other_ref.age_evaluator))
+                        and _overlap(_interval(ref.evaluator),
+                                     _interval(other_ref.evaluator))):
+                    yield ref, other_ref
+
+    @staticmethod
+    def _sweep(references):
+        intervals = sorted(
+            (_interval(ref.evaluator) + (ref, ) for ref in references),
+            key=lambda x: (x[0], not x[1]))
+        active = []
+        for lower, lower_inclusive, upper, upper_inclusive, ref in intervals:
+            active = [
+                interval for interval in active
+                if interval[2] > lower
+                or (interval[2] == lower and interval[3] and lower_inclusive)]
+            for interval in active:
+                yield interval[4], ref
+            active.append((lower, lower_inclusive, upper, upper_inclusive, ref))
+
+    @staticmethod
+    def _keys(reference):
+        gender = reference.gender or ''
+        genders = {gender[i:j] for i in range(len(gender))
+                   for j in range(i + 1, len(gender) + 1)}
+        return [(reference.units, gender) for gender in genders]
+
+    def _refresh(self):
+        """Builds the tables for each key with references added
+        since the last lookup.
+        """
+        for key in list(self._dirty):
+            self._tables[key] = self._build(self._references[key])
+            self._dirty.discard(key)
+
+    def _build(self, references):
+        if self.sort_key:
+            references = sorted(
+                references, key=self.sort_key, reverse=bool(self.reverse))
+        by_age_units = {}
+        for ref in references:
+            by_age_units.setdefault(ref.age_evaluator.units, []).append(ref)
+        return tuple(
+            AgeTable(age_units=age_units, references=refs)
+            for age_units, refs in by_age_units.items())
+
+
+def _interval(evaluator):
+    """Returns (lower, lower_inclusive, upper, upper_inclusive) for
+    an evaluator where a missing bound is infinite.
+    """
+    return (evaluator.lower or -inf, evaluator.lower_operator == '<=',
+            evaluator.upper or inf, evaluator.upper_operator == '<=')
+
+
+def _days(age_evaluator):
+    """Returns the age interval of an age evaluator in days.
+    """
+    lower, lower_inclusive, upper, upper_inclusive = _interval(age_evaluator)
+    factor = DAYS[age_evaluator.units]
+    return lower * factor, lower_inclusive, upper * factor, upper_inclusive
+
+
+def _overlap(interval, other):
+    """Returns True if two intervals, as returned by `_interval`,
+    share a value.
+    """
+    return all(
+        a[0] < b[2] or (a[0] == b[2] and a[1] and b[3])
+        for a, b in [(interval, other), (other, interval)])
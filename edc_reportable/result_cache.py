@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+MISSING = object()
+
+
+class ResultCache:
+
+    """A bounded LRU cache of evaluation results with hit
+    and miss counters.
+
+    `None` is a valid result so `get` returns MISSING on a miss.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize or 1024
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(maxsize={self.maxsize}, '
+                f'hits={self.hits}, misses={self.misses})')
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getstate__(self):
+        """Pickles the size only; results are not kept.
+        """
+        return dict(maxsize=self.maxsize)
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def get(self, key):
+        with self._lock:
+            try:
+                result = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def set(self, key, result):
+        with self._lock:
+            self._data[key] = result
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Removes all results but keeps the counters.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def info(self):
+        return dict(hits=self.hits, misses=self.misses,
+                    size=len(self._data), maxsize=self.maxsize)
@@ -1,40 +1,234 @@
 import csv
 import os
 
-from .grade_reference import GradeReference
+from copy import deepcopy
+from functools import partial
+from threading import RLock
+from types import MappingProxyType
+
+from .evaluator import InvalidCombination, InvalidLowerBound, InvalidUnits
+from .evaluator import InvalidUpperBound
+from .export import fieldnames, iter_rows, write_parquet
+from .grade_reference import GradeReference, GradeError
+from .instrumentation import Event, InMemorySink, OVERLAP, REGISTER
 from .normal_reference import NormalReference
-from .parsers import unparse
+from .parsers import parse, ParserError
 from .reference_collection import ReferenceCollection
-from .value_reference_group import ValueReferenceGroup, GRADING, NORMAL
+from .snapshots import SnapshotError, definitions_hash, dump, load
+from .value_reference_group import BoundariesOverlap, ValueReferenceGroup, GRADING, NORMAL
+
+
+class ReadCsvError(Exception):
+    pass
+
+
+def _to_number(value):
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _to_bool(value):
+    return {'True': True, 'False': False}.get(value)
+
+
+CSV_CONVERTERS = {
+    'grade': int,
+    'lower': _to_number,
+    'lower_inclusive': _to_bool,
+    'upper': _to_number,
+    'upper_inclusive': _to_bool,
+    'age_lower': _to_number,
+    'age_upper': _to_number,
+    'age_units': lambda x: x or None,
+    'age_lower_inclusive': _to_bool,
+    'age_upper_inclusive': _to_bool}
+
+BOUND_COLUMNS = ['lower', 'lower_inclusive', 'upper', 'upper_inclusive']
+
+
+def build_group(name, normal_datas, grading_datas, units=None):
+    """Returns a ValueReferenceGroup of the normal and grading
+    references for one test.
+    """
+    grp = ValueReferenceGroup(name=name, units=units)
+    for data in normal_datas:
+        grp.add_normal(NormalReference(name=name, **data))
+    for data in grading_datas:
+        grp.add_grading(GradeReference(name=name, **data))
+    return grp
 
 
 class Reportables:
 
+    """A registry of reference collections by name.
+
+    The registry is a read-only mapping that is never changed.
+    Registering a collection builds a new collection, or a copy of
+    the registered one, and then replaces the mapping in one step.
+    Readers need no lock and never see a partly built collection.
+    """
+
     def __init__(self):
-        self._registry = {}
+        self._registry = MappingProxyType({})
+        self._lock = RLock()
+        self.instrumentation = None
+        self._sample_every = None
 
     def __iter__(self):
         return iter(self._registry.items())
 
-    def register(self, name=None, normal_data=None, grading_data=None):
-        if name in self._registry:
-            reference_collection = self._registry.get(name)
-        else:
-            reference_collection = ReferenceCollection(name=name)
+    @property
+    def registry(self):
+        """Returns the current read-only mapping of collections.
+
+        Keep a reference to it to read a consistent set of
+        collections across several lookups.
+        """
+        return self._registry
+
+    def register(self, name=None, normal_data=None, grading_data=None, units=None,
+                 snapshot_path=None, lazy=None):
+        """Registers a collection of normal and grading references.
+
+        `units` is an optional dictionary of the units to convert
+        all references to, by test name.
+
+        If `snapshot_path` is given and the collection is not yet
+        registered, the collection is loaded from a snapshot in that
+        folder written for the same definitions. If there is none,
+        the collection is built and a snapshot is written.
+
+        If `lazy` is True, each group is built and validated the
+        first time it is requested instead of now. Call `warm` to
+        build them all. `lazy` is ignored if `snapshot_path` is given.
+        """
+        filename = key = None
+        if snapshot_path and name not in self._registry:
+            filename = self._snapshot_filename(name, snapshot_path)
+            key = definitions_hash(normal_data, grading_data, units)
+            try:
+                reference_collection = load(filename, key=key)
+            except SnapshotError:
+                pass
+            else:
+                self._publish(reference_collection, validate=False)
+                return
+        lazy = lazy and not snapshot_path
+        with self._lock:
+            reference_collection = self._build(
+                self._copy_or_create(name), normal_data, grading_data, units, lazy=lazy)
+            self._publish(reference_collection, validate=not lazy)
+        if filename:
+            dump(reference_collection, filename, key=key)
+
+    def reload(self, name=None, normal_data=None, grading_data=None, units=None):
+        """Replaces a registered collection with one built from
+        these definitions and returns it.
+
+        The new collection is built and validated before it
+        replaces the old one. The cache enabled on the old
+        collection is enabled on the new one.
+        """
+        previous = self.get(name)
+        reference_collection = (
+            ReferenceCollection(name=name) if previous is None
+            else previous.copy(groups=False))
+        self._build(reference_collection, normal_data, grading_data, units)
+        self._publish(reference_collection)
+        return reference_collection
+
+    def _copy_or_create(self, name):
+        """Returns a copy of the registered collection, so that it
+        is not changed while it may be read, or a new collection.
+        """
+        try:
+            return self._registry[name].copy()
+        except KeyError:
+            return ReferenceCollection(name=name)
+
+    @staticmethod
+    def _build(reference_collection, normal_data, grading_data, units=None, lazy=None):
+        units = units or {}
         for name, datas in normal_data.items():
-            grp = ValueReferenceGroup(name=name)
-            for data in datas:
-                val_ref = NormalReference(name=name, **data)
-                grp.add_normal(val_ref)
-            reference_collection.register(grp)
+            build = partial(build_group, name, datas, grading_data.get(name, []),
+                            units=units.get(name))
+            if lazy:
+                reference_collection.register_lazy(name, build)
+            else:
+                reference_collection.register(build())
         for name, datas in grading_data.items():
-            grp = reference_collection.get(name)
-            for data in datas:
-                grade_ref = GradeReference(name=name, **data)
-                grp.add_grading(grade_ref)
-            reference_collection.update_grp(grp)
-        site_reportables._registry.update(
-            {reference_collection.name: reference_collection})
+            if name not in normal_data:
+                grp = deepcopy(reference_collection.get(name))
+                for data in datas:
+                    grp.add_grading(GradeReference(name=name, **data))
+                reference_collection.update_grp(grp)
+        return reference_collection
+
+    def warm(self, name=None):
+        """Builds the groups of a collection, or of all collections,
+        registered with `lazy=True`.
+        """
+        for reference_collection in ([self.get(name)] if name else self._registry.values()):
+            reference_collection.warm()
+
+    def dump_snapshot(self, name=None, path=None):
+        """Writes a snapshot of a registered collection and returns
+        the filename.
+        """
+        return dump(self.get(name), self._snapshot_filename(name, path))
+
+    def load_snapshot(self, name=None, path=None):
+        """Registers a collection from a snapshot written by
+        `dump_snapshot` without rebuilding or validating it.
+        """
+        reference_collection = load(self._snapshot_filename(name, path))
+        self._publish(reference_collection, validate=False)
+        return reference_collection
+
+    @staticmethod
+    def _snapshot_filename(collection_name=None, path=None):
+        path = os.path.expanduser(path or '~/')
+        return os.path.join(path, f'{collection_name}_snapshot.pickle')
+
+    def _publish(self, reference_collection, validate=True):
+        try:
+            if validate:
+                reference_collection.validate()
+        except BoundariesOverlap:
+            if self.instrumentation:
+                self.instrumentation(Event(
+                    reference_collection.name, None, REGISTER, OVERLAP, None, None))
+            raise
+        if self.instrumentation:
+            reference_collection.enable_instrumentation(
+                self.instrumentation, sample_every=self._sample_every)
+        with self._lock:
+            self._registry = MappingProxyType(
+                {**self._registry, reference_collection.name: reference_collection})
+
+    def enable_instrumentation(self, sink=None, sample_every=None):
+        """Sends an Event to `sink` for each evaluation in every
+        registered collection and for each registration that
+        raises BoundariesOverlap. Returns the sink.
+
+        The default sink is an InMemorySink. Call its `snapshot`
+        method to read the counters.
+        """
+        self.instrumentation = sink or InMemorySink()
+        self._sample_every = sample_every
+        for reference_collection in self._registry.values():
+            reference_collection.enable_instrumentation(
+                self.instrumentation, sample_every=sample_every)
+        return self.instrumentation
+
+    def disable_instrumentation(self):
+        self.instrumentation = None
+        for reference_collection in self._registry.values():
+            reference_collection.disable_instrumentation()
 
     def get(self, name):
         return self._registry.get(name)
@@ -46,39 +240,117 @@ class Reportables:
         return self._registry.get(name)[GRADING]
 
     def read_csv(self, name=None, path=None):
-        pass
+        """Registers a collection from the normal and grading CSV
+        files written by `to_csv`.
+
+        References are created and validated row by row. Bounds
+        are read from the bound columns or, if absent, parsed
+        from the `description` column, as are the gender and age
+        bounds if their columns are blank. A grading file is optional.
+        """
+        filename1, filename2 = self._filenames(name, path)
+        groups = {}
+        for ref in self._read_references(filename1, NormalReference):
+            try:
+                grp = groups[ref.name]
+            except KeyError:
+                grp = groups[ref.name] = ValueReferenceGroup(name=ref.name)
+            grp.add_normal(ref)
+        if os.path.exists(filename2):
+            for ref in self._read_references(filename2, GradeReference):
+                try:
+                    grp = groups[ref.name]
+                except KeyError:
+                    grp = groups[ref.name] = ValueReferenceGroup(name=ref.name)
+                grp.add_grading(ref)
+        with self._lock:
+            reference_collection = self._copy_or_create(name)
+            for grp in groups.values():
+                reference_collection.register(grp)
+            self._publish(reference_collection)
+        return reference_collection
+
+    @staticmethod
+    def _read_references(filename, reference_cls):
+        """Yields a reference for each row in the CSV file.
+        """
+        with open(filename, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            columns = [(column, index, CSV_CONVERTERS.get(column))
+                       for index, column in enumerate(header)
+                       if column in reference_cls.fields]
+            description = None
+            if not set(BOUND_COLUMNS).issubset(header):
+                columns = [c for c in columns if c[0] not in BOUND_COLUMNS]
+                description = header.index('description')
+            for row in reader:
+                try:
+                    kwargs = {
+                        column: converter(row[index]) if converter else row[index]
+                        for column, index, converter in columns}
+                    if description is not None:
+                        parsed = parse(row[description])
+                        parsed.update(
+                            {k: v for k, v in kwargs.items() if v is not None})
+                        kwargs = parsed
+                    reference = reference_cls(**kwargs)
+                except (IndexError, ValueError, ParserError, GradeError,
+                        InvalidCombination, InvalidLowerBound, InvalidUpperBound,
+                        InvalidUnits) as e:
+                    raise ReadCsvError(
+                        f'{filename}, line {reader.line_num}. Got {e}') from e
+                yield reference
+
+    @staticmethod
+    def _filenames(collection_name=None, path=None, extension=None):
+        path = os.path.expanduser(path or '~/')
+        extension = extension or 'csv'
+        return (os.path.join(path, f'{collection_name}_normal_ranges.{extension}'),
+                os.path.join(path, f'{collection_name}_grading.{extension}'))
+
+    def iter_rows(self, collection_name=None, kind=None):
+        """Yields the column names and then a list of values for each
+        normal or, if `kind` is 'grading', grading reference.
+
+        Rows are built one at a time. References are not changed.
+        """
+        yield fieldnames(kind)
+        yield from iter_rows(self.get(collection_name), kind)
 
     def to_csv(self, collection_name=None, path=None):
-        path = path or '~/'
-        path = os.path.expanduser(path)
-        filename1 = os.path.join(path, f'{collection_name}_normal_ranges.csv')
-        filename2 = os.path.join(path, f'{collection_name}_grading.csv')
-        reference_collection = self.get(collection_name)
-        data = reference_collection.as_data()
-        try:
-            fieldnames = list(data.get(NORMAL)[0].keys())
-        except IndexError:
-            pass
-        else:
-            fieldnames.insert(1, 'description')
-            with open(filename1, 'w') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                for dct in data.get(NORMAL):
-                    dct.update(description=unparse(**dct))
-                    writer.writerow(dct)
-        try:
-            fieldnames = list(data.get(GRADING)[0].keys())
-        except IndexError:
-            pass
-        else:
-            fieldnames.insert(1, 'description')
-            with open(filename2, 'w') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                for dct in data.get(GRADING):
-                    dct.update(description=unparse(**dct))
-                    writer.writerow(dct)
+        """Writes the normal and grading references to CSV files
+        and returns the filenames.
+
+        A file is not written if there are no references of its kind.
+        """
+        filename1, filename2 = self._filenames(collection_name, path)
+        self.warm(collection_name)
+        reference_collection = self.get(collection_name).copy()
+        for filename, kind in [(filename1, NORMAL), (filename2, GRADING)]:
+            rows = iter_rows(reference_collection, kind)
+            first = next(rows, None)
+            if first is not None:
+                with open(filename, 'w') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(fieldnames(kind))
+                    writer.writerow(first)
+                    writer.writerows(rows)
+        return filename1, filename2
+
+    def to_parquet(self, collection_name=None, path=None, batch_size=None):
+        """Writes the normal and grading references to Parquet files
+        and returns the filenames. Requires pyarrow.
+
+        As for `to_csv`, a file is not written if there are no
+        references of its kind. Use `export.to_arrow` for an Arrow
+        table.
+        """
+        filename1, filename2 = self._filenames(collection_name, path, extension='parquet')
+        self.warm(collection_name)
+        reference_collection = self.get(collection_name).copy()
+        for filename, kind in [(filename1, NORMAL), (filename2, GRADING)]:
+            write_parquet(reference_collection, filename, kind, batch_size=batch_size)
         return filename1, filename2
 
 
@@ -0,0 +1,91 @@
+import json
+import os
+import pickle
+
+from functools import lru_cache
+from hashlib import sha256
+from importlib import import_module
+from tempfile import NamedTemporaryFile
+
+from .value_reference_group import ValueReferenceGroup
+
+# change when the snapshot format changes
+SNAPSHOT_VERSION = 3
+
+# modules of the pickled classes. A snapshot written by other
+# code for these modules is stale.
+SNAPSHOT_MODULES = [
+    'age_evaluator', 'evaluator', 'grade_reference', 'normal_reference',
+    'reference_collection', 'reference_index', 'result_cache', 'units',
+    'value_reference', 'value_reference_group']
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class StaleSnapshot(SnapshotError):
+    pass
+
+
+def definitions_hash(normal_data=None, grading_data=None, units=None):
+    """Returns a hex digest of the definitions passed to
+    `Reportables.register`.
+
+    The registered unit conversions are included if `units`
+    is given.
+    """
+    conversions = ValueReferenceGroup.conversions.items() if units else None
+    content = json.dumps(
+        [SNAPSHOT_VERSION, normal_data, grading_data, units, conversions],
+        sort_keys=True, default=repr)
+    return sha256(content.encode()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """Returns the snapshot version and a hex digest of the
+    modules of the pickled classes.
+    """
+    digest = sha256()
+    for name in SNAPSHOT_MODULES:
+        with open(import_module(f'.{name}', __package__).__file__, 'rb') as f:
+            digest.update(f.read())
+    return f'{SNAPSHOT_VERSION}-{digest.hexdigest()}'
+
+
+def dump(reference_collection, filename, key=None):
+    """Writes a pickled ReferenceCollection to `filename`.
+
+    Groups registered lazily are built first.
+
+    The file is replaced atomically so that a process reading
+    the snapshot never sees a partial file.
+    """
+    reference_collection.warm()
+    dirname = os.path.dirname(os.path.abspath(filename))
+    with NamedTemporaryFile(dir=dirname, delete=False) as f:
+        pickle.dump((code_version(), key), f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(reference_collection, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f.name, filename)
+    return filename
+
+
+def load(filename, key=None):
+    """Returns the ReferenceCollection pickled in `filename`.
+
+    Raises StaleSnapshot if the snapshot was written by another
+    version of the code or, if `key` is given, for other
+    definitions. The collection is only unpickled if the snapshot
+    is current.
+    """
+    try:
+        with open(filename, 'rb') as f:
+            version, snapshot_key = pickle.load(f)
+            if version != code_version():
+                raise StaleSnapshot(f'Snapshot {filename} was written by another version.')
+            if key is not None and snapshot_key != key:
+                raise StaleSnapshot(f'Snapshot {filename} is out of date.')
+            return pickle.load(f)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError) as e:
+        raise SnapshotError(f'Unable to read snapshot {filename}. Got {e}') from e
@@ -0,0 +1,165 @@
+import asyncio
+
+from collections import namedtuple
+from edc_base.utils import AgeValueError
+
+from .value_reference_group import NotEvaluated
+
+GradeResult = namedtuple('GradeResult', 'grade normal error')
+GradeResult.__doc__ = """The result of grading one record.
+
+`grade` is the grade or None. `normal` is True or False if the
+normal references were checked, otherwise None. `error` is the
+message of the exception raised for the record, if any.
+"""
+
+
+class Grader:
+
+    """A callable that returns a GradeResult for a record of
+    (name, value, units, gender, dob, report_datetime).
+
+    The group and the age are reused while consecutive records
+    are for the same test and subject.
+
+    A record with a missing or invalid value, units or dob, or
+    that cannot be evaluated, is returned with the error instead
+    of raising.
+    """
+
+    def __init__(self, reference_collection, normal=None):
+        self.reference_collection = reference_collection
+        self.normal = normal
+        self.name = self.grp = self.age_key = self.rdelta = None
+
+    def __call__(self, record):
+        name, value, units, gender, dob, report_datetime = record
+        if name != self.name:
+            self.name, self.grp = name, self.reference_collection.get(name)
+            self.age_key = None
+        grp = self.grp
+        if grp is None:
+            return GradeResult(
+                None, None, f'{name} value not graded. No reference group found.')
+        error = self.check(name, value, units, dob)
+        if error:
+            return GradeResult(None, None, error)
+        try:
+            if (dob, report_datetime) != self.age_key:
+                self.age_key = None
+                self.rdelta = grp.age_func(dob, report_datetime)
+                self.age_key = (dob, report_datetime)
+            grade = grp.get_grade(
+                value=value, units=units, gender=gender, rdelta=self.rdelta)
+            is_normal = None
+            if self.normal:
+                is_normal = grp.get_normal(
+                    value=value, units=units, gender=gender, rdelta=self.rdelta) is not None
+        except NotEvaluated as e:
+            return GradeResult(None, None, str(e))
+        except AgeValueError as e:
+            return GradeResult(None, None, f'{name} value not evaluated. {e}')
+        return GradeResult(None if grade is None else grade.grade, is_normal, None)
+
+    @staticmethod
+    def check(name, value, units, dob):
+        """Returns a message if the value, units or dob of a record
+        are missing or invalid, otherwise None.
+        """
+        if value is None:
+            return f'{name} value not evaluated. Value is required.'
+        try:
+            float(value)
+        except (TypeError, ValueError):
+            return f'{name} value not evaluated. Invalid value. Got {repr(value)}.'
+        if not units or not isinstance(units, str):
+            return f'{name} value not evaluated. Units are required. Got {repr(units)}.'
+        if not dob:
+            return f'{name} value not evaluated. Date of birth is required.'
+        return None
+
+
+def grade_stream(reference_collection, records, normal=None):
+    """Yields a GradeResult for each record of
+    (name, value, units, gender, dob, report_datetime).
+
+    Records are read one at a time so any iterable, of any length,
+    may be passed. See Grader.
+
+    If `normal` is True, the value is also checked against the
+    normal references.
+    """
+    return map(Grader(reference_collection, normal=normal), records)
+
+
+async def agrade_stream(reference_collection, records, normal=None, yield_every=None):
+    """Yields a GradeResult for each record, as for `grade_stream`.
+
+    `records` may be an iterable or an async iterable. Groups not
+    yet built are built first in a thread, so the event loop never
+    waits on a build. Grading itself runs in the event loop; control
+    is returned to it every `yield_every` (default 100) records, and
+    on each await of an async iterable, so that a long stream does
+    not block other tasks.
+    """
+    await warm(reference_collection)
+    grader = Grader(reference_collection, normal=normal)
+    yield_every = yield_every or 100
+    count = 0
+    async for record in _aiter(records):
+        yield grader(record)
+        count += 1
+        if not count % yield_every:
+            await asyncio.sleep(0)
+
+
+async def warm(reference_collection):
+    """Builds and validates the groups of the collection not yet
+    built in a thread of the default executor.
+    """
+    if not reference_collection.built:
+        await asyncio.get_running_loop().run_in_executor(None, reference_collection.warm)
+
+
+async def _aiter(records):
+    if hasattr(records, '__aiter__'):
+        async for record in records:
+            yield record
+    else:
+        for record in records:
+            yield record
+
+
+async def gather_bounded(awaitables, limit=None):
+    """Returns a list of the results of the awaitables, in order,
+    running at most `limit` (default 10) at a time.
+    """
+    semaphore = asyncio.Semaphore(limit or 10)
+
+    async def run(awaitable):
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(*[run(awaitable) for awaitable in awaitables])
+
+
+async def agrade_panels(reference_collection, panels, limit=None, normal=None,
+                        yield_every=None):
+    """Returns a list of a list of GradeResults for each panel,
+    with at most `limit` panels in progress at a time.
+
+    A panel is an iterable or async iterable of records, e.g. the
+    results of one subject visit read from an async source.
+
+    Grading runs in the event loop, so panels are graded one at a
+    time between awaits: `limit` bounds the panels waiting on their
+    sources, not CPU parallelism. Panels take turns every
+    `yield_every` records. Use `grade_parallel` to use more CPUs.
+    """
+    await warm(reference_collection)
+
+    async def grade_panel(records):
+        return [result async for result in agrade_stream(
+            reference_collection, records, normal=normal, yield_every=yield_every)]
+
+    return await gather_bounded([grade_panel(panel) for panel in panels], limit=limit)
@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class LabResult(models.Model):
+
+    name = models.CharField(max_length=25)
+
+    value = models.FloatField(null=True)
+
+    units = models.CharField(max_length=25)
+
+    gender = models.CharField(max_length=1)
+
+    dob = models.DateField()
+
+    report_datetime = models.DateTimeField()
+
+    grade = models.IntegerField(null=True)
+
+    normal = models.BooleanField(null=True)
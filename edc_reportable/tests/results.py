@@ -0,0 +1,42 @@
+import random
+
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from edc_constants.constants import FEMALE, MALE
+from edc_reportable import MILLIGRAMS_PER_DECILITER, MILLIMOLES_PER_LITER
+from edc_reportable import GRAMS_PER_DECILITER, TEN_X_9_PER_LITER, IU_LITER
+from pytz import utc
+
+report_datetime = utc.localize(datetime(2017, 12, 7))
+
+# the units and a range of values, from grade 4 to above normal,
+# for each test in `reportables.py`
+value_ranges = {
+    'haemoglobin': (GRAMS_PER_DECILITER, 5.0, 19.0),
+    'platelets': (TEN_X_9_PER_LITER, 10, 500),
+    'neutrophil': (TEN_X_9_PER_LITER, 0.2, 8.0),
+    'sodium': (MILLIMOLES_PER_LITER, 115, 160),
+    'potassium': (MILLIMOLES_PER_LITER, 1.5, 7.5),
+    'magnesium': (MILLIMOLES_PER_LITER, 0.2, 1.5),
+    'alt': (IU_LITER, 5, 500),
+    'creatinine': (MILLIGRAMS_PER_DECILITER, 0.3, 6.0),
+}
+
+
+def make_results(count=None, seed=None):
+    """Returns a list of `count` result records of
+    (name, value, units, gender, dob, report_datetime) for the
+    tests in `reportables.py`, for adults.
+    """
+    rnd = random.Random(seed or 0)
+    names = sorted(value_ranges)
+    results = []
+    for _ in range(count or 100):
+        name = rnd.choice(names)
+        units, lower, upper = value_ranges[name]
+        results.append((
+            name, round(rnd.uniform(lower, upper), 2), units,
+            rnd.choice([MALE, FEMALE]),
+            report_datetime - relativedelta(days=rnd.randrange(365 * 19, 365 * 90)),
+            report_datetime))
+    return results
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+from dateutil.relativedelta import relativedelta
+from edc_constants.constants import MALE
+from unittest import TestCase, mock
+
+from ..site_reportables import Reportables
+from ..streaming import agrade_panels, gather_bounded
+from .reportables import normal_data, grading_data
+from .results import make_results
+
+
+async def aiterate(records):
+    for record in records:
+        await asyncio.sleep(0)
+        yield record
+
+
+class TestAsync(TestCase):
+
+    def setUp(self):
+        reportables = Reportables()
+        reportables.register(
+            name='test', normal_data=normal_data, grading_data=grading_data)
+        self.reference_collection = reportables.get('test')
+        self.records = make_results(count=60, seed=6)
+        self.expected = list(self.reference_collection.grade_stream(self.records, normal=True))
+
+    def test_aget_grade(self):
+        grp = self.reference_collection.get('haemoglobin')
+        opts = dict(units='g/dL', gender=MALE, rdelta=relativedelta(years=25))
+        grade = asyncio.run(grp.aget_grade(value=6.0, **opts))
+        self.assertEqual(grade.grade, 4)
+        self.assertTrue(asyncio.run(grp.aget_normal(value=15, **opts)))
+
+    def test_agrade_stream(self):
+        async def collect(records):
+            return [result async for result in self.reference_collection.agrade_stream(
+                records, normal=True, yield_every=7)]
+
+        self.assertEqual(asyncio.run(collect(self.records)), self.expected)
+        self.assertEqual(asyncio.run(collect(aiterate(self.records))), self.expected)
+
+    def test_agrade_panels(self):
+        panels = [self.records[:20], aiterate(self.records[20:40]), self.records[40:]]
+        results = asyncio.run(agrade_panels(
+            self.reference_collection, panels, limit=2, normal=True))
+        self.assertEqual([len(panel) for panel in results], [20, 20, 20])
+        self.assertEqual(sum(results, []), self.expected)
+
+    def test_lazy_groups_built_in_thread(self):
+        reportables = Reportables()
+        reportables.register(
+            name='test', normal_data=normal_data, grading_data=grading_data, lazy=True)
+        reference_collection = reportables.get('test')
+        threads = []
+        warm = reference_collection.warm
+
+        def record_thread():
+            threads.append(threading.get_ident())
+            warm()
+
+        async def collect():
+            with mock.patch.object(reference_collection, 'warm', record_thread):
+                return [result async for result in reference_collection.agrade_stream(
+                    self.records, normal=True)]
+
+        self.assertFalse(reference_collection.built)
+        self.assertEqual(asyncio.run(collect()), self.expected)
+        self.assertTrue(reference_collection.built)
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.get_ident())
+
+    def test_gather_bounded(self):
+        running = []
+        peak = []
+
+        async def task(index):
+            running.append(index)
+            peak.append(len(running))
+            await asyncio.sleep(0)
+            running.remove(index)
+            return index
+
+        results = asyncio.run(gather_bounded([task(index) for index in range(10)], limit=3))
+        self.assertEqual(results, list(range(10)))
+        self.assertEqual(max(peak), 3)
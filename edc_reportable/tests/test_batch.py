@@ -0,0 +1,84 @@
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from edc_constants.constants import MALE, FEMALE
+from pytz import utc
+from unittest import TestCase, skipIf
+
+from ..age_evaluator import cached_age
+from ..normal_reference import NormalReference
+from ..site_reportables import site_reportables
+from ..value_reference_group import BoundariesOverlap, NotEvaluated, np
+from .reportables import normal_data, grading_data
+
+
+@skipIf(np is None, 'numpy is not installed')
+class TestBatch(TestCase):
+
+    def setUp(self):
+        site_reportables._registry = {}
+        site_reportables.register(
+            name='my_project',
+            normal_data=normal_data,
+            grading_data=grading_data)
+        self.reportables = site_reportables.get('my_project')
+        self.report_datetime = utc.localize(datetime(2017, 12, 7))
+        self.dob = self.report_datetime - relativedelta(years=25)
+
+    def test_matches_scalar(self):
+        haemoglobin = self.reportables.get('haemoglobin')
+        values = [5.0, 6.6, 7.0, 8.0, 8.6, 9.0, 13.0, 15.0, 16.0, 18.0]
+        genders = [MALE, FEMALE] * 5
+        opts = dict(units='g/dL', report_datetime=self.report_datetime)
+        grades = haemoglobin.get_grade_many(
+            values, units='g/dL', genders=genders, dobs=[self.dob] * 10,
+            report_datetimes=self.report_datetime)
+        normal = haemoglobin.get_normal_many(
+            values, units=['g/dL'] * 10, genders=genders, dobs=[self.dob] * 10,
+            report_datetimes=[self.report_datetime] * 10)
+        for index, value in enumerate(values):
+            with self.subTest(value=value, gender=genders[index]):
+                grade = haemoglobin.get_grade(
+                    value=value, gender=genders[index], dob=self.dob, **opts)
+                self.assertEqual(grades[index], grade.grade if grade else 0)
+                self.assertEqual(
+                    normal[index],
+                    bool(haemoglobin.get_normal(
+                        value=value, gender=genders[index], dob=self.dob, **opts)))
+
+    def test_cached_age_now(self):
+        haemoglobin = self.reportables.get('haemoglobin')
+        haemoglobin.age_func = cached_age
+        cached_age.cache_clear()
+        opts = dict(units='g/dL', genders=[MALE] * 2, dobs=[self.dob] * 2)
+        for _ in range(3):
+            self.assertEqual(list(haemoglobin.get_grade_many([6.0, 15.0], **opts)), [4, 0])
+        self.assertEqual(cached_age.cache_info().currsize, 0)
+        haemoglobin.get_grade_many(
+            [6.0, 15.0], report_datetimes=self.report_datetime, **opts)
+        self.assertEqual(cached_age.cache_info().currsize, 1)
+
+    def test_not_evaluated(self):
+        haemoglobin = self.reportables.get('haemoglobin')
+        self.assertRaises(
+            NotEvaluated,
+            haemoglobin.get_grade_many,
+            [8.0, 8.0], units=['g/dL', 'mmol/L'], genders=[MALE, MALE],
+            dobs=[self.dob, self.dob], report_datetimes=self.report_datetime)
+        self.assertRaises(
+            NotEvaluated,
+            haemoglobin.get_normal_many,
+            [15.0, 15.0], units='g/dL', genders=[MALE, MALE],
+            dobs=[self.dob, self.report_datetime.date()],
+            report_datetimes=self.report_datetime)
+
+    def test_overlap(self):
+        haemoglobin = self.reportables.get('haemoglobin')
+        haemoglobin.add_normal(NormalReference(
+            name='haemoglobin', lower=17.0, upper=20.0, units='g/dL',
+            gender=MALE, age_lower=18, age_units='years',
+            age_lower_inclusive=True))
+        self.assertRaises(
+            BoundariesOverlap,
+            haemoglobin.get_normal_many,
+            [14.0, 17.4], units='g/dL', genders=[MALE, MALE],
+            dobs=[self.dob, self.dob], report_datetimes=self.report_datetime)
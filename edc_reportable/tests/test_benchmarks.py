@@ -0,0 +1,32 @@
+from django.test import TestCase
+
+from ..benchmarks import compare, make_collection_data, make_results, run
+
+
+class TestBenchmarks(TestCase):
+
+    def test_collection_data(self):
+        normal_data, grading_data = make_collection_data(analytes=3, age_bands=2)
+        self.assertEqual(len(normal_data), 3)
+        self.assertEqual(len(normal_data['analyte0']), 2)
+        self.assertEqual(len(grading_data['analyte0']), 4)
+
+    def test_results_are_repeatable(self):
+        self.assertEqual(list(make_results(count=10, seed=1)),
+                         list(make_results(count=10, seed=1)))
+
+    def test_run(self):
+        data = run(analytes=2, age_bands=2, count=20, repeat=1)
+        for name in ['register', 'parse', 'get_normal', 'get_grade', 'to_csv']:
+            self.assertIn(name, data)
+            self.assertEqual(set(data[name]), {'n', 'seconds', 'us_per_op'})
+
+    def test_run_by_gender(self):
+        data = run(analytes=2, age_bands=2, count=20, repeat=1, genders=[['M'], ['F']])
+        self.assertEqual(data['register']['n'], 2 * 2 * 2 * 3)
+
+    def test_compare(self):
+        baseline = {'get_grade': {'us_per_op': 10.0}, 'parse': {'us_per_op': 10.0}}
+        current = {'get_grade': {'us_per_op': 12.0}, 'parse': {'us_per_op': 10.5},
+                   'to_csv': {'us_per_op': 1.0}}
+        self.assertEqual(list(compare(baseline, current)), ['get_grade'])
@@ -5,10 +5,11 @@ from edc_constants.constants import MALE
 from pytz import utc
 from unittest import TestCase
 
-from ..age_evaluator import AgeEvaluator
+from ..age_evaluator import AgeEvaluator, cached_age
 from ..evaluator import Evaluator, ValueBoundryError, InvalidUpperBound
 from ..evaluator import InvalidCombination, InvalidLowerBound, InvalidUnits
 from ..normal_reference import NormalReference
+from ..value_reference_group import ValueReferenceGroup
 
 
 class TestEvaluators(TestCase):
@@ -153,6 +154,29 @@ class TestEvaluators(TestCase):
             InvalidCombination,
             Evaluator, lower=11, upper=10, units='mg/dL')
 
+    def test_evaluator_message(self):
+        ref = Evaluator(lower=10, upper=100, units='mg/dL',
+                        lower_inclusive=True)
+        with self.assertRaises(ValueBoundryError) as cm:
+            ref.in_bounds_or_raise(9, units='mg/dL')
+        self.assertEqual(str(cm.exception), '10.0<=9.0<100.0')
+        ref = Evaluator(lower=None, upper=100, units='mg/dL')
+        with self.assertRaises(ValueBoundryError) as cm:
+            ref.in_bounds_or_raise(100, units='mg/dL')
+        self.assertEqual(str(cm.exception), '100.0<100.0')
+
+    def test_in_bounds(self):
+        ref = Evaluator(lower=10, upper=100, units='mg/dL', lower_inclusive=True)
+        self.assertFalse(ref.in_bounds(9))
+        self.assertTrue(ref.in_bounds(10))
+        self.assertTrue(ref.in_bounds('99.9', units='mg/dL'))
+        self.assertFalse(ref.in_bounds(100))
+        self.assertRaises(InvalidUnits, ref.in_bounds, 50, units='mmol/L')
+
+        age_eval = AgeEvaluator(age_lower=24, age_upper=26)
+        self.assertTrue(age_eval.in_bounds(rdelta=relativedelta(years=25)))
+        self.assertFalse(age_eval.in_bounds(rdelta=relativedelta(years=26)))
+
     def test_age_evaluator(self):
         """Test the age evaluator whiich is a child class
         of the basic evaluator.
@@ -217,3 +241,36 @@ class TestEvaluators(TestCase):
             age_upper=25,
             gender=MALE)
         self.assertFalse(ref.age_match(dob, report_datetime))
+
+    def test_age_match_rdelta(self):
+        report_datetime = utc.localize(datetime(2017, 12, 7))
+        dob = report_datetime - relativedelta(years=25)
+        ref = NormalReference(
+            lower=10,
+            upper=None,
+            units='mg/dL',
+            age_lower=24,
+            age_upper=26,
+            gender=MALE)
+        self.assertTrue(ref.age_match(rdelta=relativedelta(years=25)))
+        self.assertFalse(ref.age_match(rdelta=relativedelta(years=26)))
+        self.assertEqual(cached_age(dob, report_datetime), age(dob, report_datetime))
+        self.assertIs(cached_age(dob, report_datetime),
+                      cached_age(dob, report_datetime))
+
+    def test_cached_age_in_group(self):
+        report_datetime = utc.localize(datetime(2017, 12, 7))
+        dob = report_datetime - relativedelta(years=25)
+        grp = ValueReferenceGroup(name='labtest')
+        grp.age_func = cached_age
+        grp.add_normal(NormalReference(
+            name='labtest', lower=10, upper=20, units='mg/dL', age_lower=18,
+            age_units='years', age_lower_inclusive=True, gender=MALE))
+        cached_age.cache_clear()
+        for _ in range(3):
+            grp.get_normal(value=15, units='mg/dL', gender=MALE, dob=dob,
+                           report_datetime=report_datetime)
+        self.assertEqual(cached_age.cache_info().hits, 2)
+        for _ in range(3):
+            grp.get_normal(value=15, units='mg/dL', gender=MALE, dob=dob)
+        self.assertEqual(cached_age.cache_info().currsize, 1)
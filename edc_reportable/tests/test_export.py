@@ -0,0 +1,83 @@
+import csv
+import os
+
+from tempfile import mkdtemp
+from unittest import TestCase, mock, skipIf
+
+from ..export import fieldnames, pa, to_arrow, write_parquet
+from ..site_reportables import Reportables
+from ..value_reference_group import GRADING, NORMAL
+from .reportables import normal_data, grading_data
+
+
+class TestExport(TestCase):
+
+    def setUp(self):
+        self.reportables = Reportables()
+        self.reportables.register(
+            name='test', normal_data=normal_data, grading_data=grading_data, lazy=True)
+        self.reference_collection = self.reportables.get('test')
+        self.path = mkdtemp()
+
+    def tearDown(self):
+        for filename in os.listdir(self.path):
+            os.remove(os.path.join(self.path, filename))
+        os.rmdir(self.path)
+
+    def test_iter_rows(self):
+        rows = self.reportables.iter_rows('test', GRADING)
+        self.assertEqual(next(rows), fieldnames(GRADING))
+        row = next(rows)
+        self.assertEqual(row[:2], [3, '7.0<=x<9.0 M 18<=AGE'])
+        self.assertEqual(len(list(rows)), 23)
+
+    def test_export_does_not_change_references(self):
+        refs = self.reference_collection.get('platelets').normal['MF']
+        before = [ref.as_dict() for ref in refs]
+        list(self.reportables.iter_rows('test', NORMAL))
+        self.reportables.to_csv(collection_name='test', path=self.path)
+        after = [ref.as_dict() for ref in refs]
+        self.assertEqual(before, after)
+        self.assertNotIn('description', after[0])
+
+    def test_to_csv(self):
+        filename1, filename2 = self.reportables.to_csv(collection_name='test', path=self.path)
+        with open(filename2) as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], fieldnames(GRADING))
+        self.assertEqual(len(rows), 25)
+        reference_collection = Reportables().read_csv(name='test', path=self.path)
+        self.assertEqual(reference_collection.as_data(), self.reference_collection.as_data())
+
+    @skipIf(pa is None, 'pyarrow is not installed')
+    def test_arrow_and_parquet(self):
+        import pyarrow.parquet as pq
+        table = to_arrow(self.reference_collection, GRADING, batch_size=5)
+        self.assertEqual(table.num_rows, 24)
+        self.assertEqual(table.column_names, fieldnames(GRADING))
+        self.assertEqual(table.column('grade').to_pylist()[:2], [3, 4])
+        filename1, filename2 = self.reportables.to_parquet(
+            collection_name='test', path=self.path, batch_size=4)
+        self.assertTrue(filename1.endswith('test_normal_ranges.parquet'))
+        self.assertEqual(pq.read_table(filename1).num_rows, 10)
+        self.assertEqual(pq.read_table(filename2).to_pylist(), table.to_pylist())
+
+    @skipIf(pa is None, 'pyarrow is not installed')
+    def test_no_grading(self):
+        reportables = Reportables()
+        reportables.register(name='test', normal_data=normal_data, grading_data={})
+        for filenames in [reportables.to_csv(collection_name='test', path=self.path),
+                          reportables.to_parquet(collection_name='test', path=self.path)]:
+            self.assertTrue(os.path.exists(filenames[0]))
+            self.assertFalse(os.path.exists(filenames[1]))
+
+    def test_requires_pyarrow(self):
+        filename = os.path.join(self.path, 'test.parquet')
+        with mock.patch('edc_reportable.export.pa', None):
+            self.assertRaises(ImportError, to_arrow, self.reference_collection)
+            self.assertRaises(
+                ImportError, write_parquet, self.reference_collection, filename)
+            self.assertRaises(
+                ImportError, self.reportables.to_parquet, collection_name='test',
+                path=self.path)
+        self.assertEqual(os.listdir(self.path), [])
@@ -0,0 +1,108 @@
+from datetime import date, datetime
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+from edc_constants.constants import FEMALE, MALE
+from pytz import utc
+
+from ..expressions import ExpressionCompiler, ExpressionError, annotate_grade
+from ..site_reportables import Reportables
+from ..value_reference_group import NotEvaluated, ValueReferenceGroup
+from ..grade_reference import GradeReference
+from ..normal_reference import NormalReference
+from .models import LabResult
+from .reportables import normal_data, grading_data
+from .results import make_results
+
+
+class TestExpressions(TestCase):
+
+    def setUp(self):
+        reportables = Reportables()
+        reportables.register(
+            name='test', normal_data=normal_data, grading_data=grading_data)
+        self.reference_collection = reportables.get('test')
+        self.records = make_results(count=300, seed=4)
+        _, _, _, _, dob, report_datetime = self.records[0]
+        self.records.extend([
+            ('cd4', 300, 'cells/mm^3', MALE, dob, report_datetime),
+            ('haemoglobin', 10.0, 'g/dL', MALE, report_datetime - relativedelta(years=10),
+             report_datetime)])
+        LabResult.objects.bulk_create([
+            LabResult(name=name, value=value, units=units, gender=gender,
+                      dob=dob.date(), report_datetime=report_datetime)
+            for name, value, units, gender, dob, report_datetime in self.records])
+
+    def expected(self, obj):
+        grp = self.reference_collection.get(obj.name)
+        opts = dict(value=obj.value, units=obj.units, gender=obj.gender,
+                    dob=obj.dob, report_datetime=obj.report_datetime)
+        try:
+            grade = grp.get_grade(**opts)
+            normal = grp.get_normal(**opts)
+        except (AttributeError, NotEvaluated):
+            return None, None
+        return (grade.grade if grade else 0), normal is not None
+
+    def test_collection(self):
+        queryset = annotate_grade(
+            LabResult.objects.all(), self.reference_collection, alias='graded',
+            normal_alias='is_normal')
+        grades = set()
+        for obj in queryset:
+            self.assertEqual((obj.graded, obj.is_normal), self.expected(obj), obj.__dict__)
+            grades.add(obj.graded)
+        self.assertEqual(grades, {None, 0, 3, 4})
+        self.assertEqual(
+            queryset.filter(graded__gte=3).count(),
+            len([obj for obj in queryset if (obj.graded or 0) >= 3]))
+
+    def test_group(self):
+        grp = self.reference_collection.get('haemoglobin')
+        queryset = annotate_grade(
+            LabResult.objects.filter(name='haemoglobin'), grp, alias='graded')
+        for obj in queryset:
+            self.assertEqual(obj.graded, self.expected(obj)[0])
+
+    def test_group_with_other_tests(self):
+        # neutrophil results are in the same units as platelets
+        grp = self.reference_collection.get('platelets')
+        queryset = annotate_grade(LabResult.objects.all(), grp, alias='graded')
+        for obj in queryset:
+            if obj.name == 'platelets':
+                self.assertEqual(obj.graded, self.expected(obj)[0])
+            else:
+                self.assertIsNone(obj.graded)
+        self.assertEqual(
+            annotate_grade(LabResult.objects.filter(name='platelets'), grp,
+                           alias='graded', name=None).filter(graded__gte=3).count(),
+            queryset.filter(graded__gte=3).count())
+        self.assertRaises(
+            ExpressionError, ExpressionCompiler, self.reference_collection, name=None)
+
+    def test_age_in_years(self):
+        report_datetime = utc.localize(datetime(2018, 1, 15, 10))
+        grp = ValueReferenceGroup(name='labtest')
+        for lower, upper in [(0, 18), (18, None)]:
+            grp.add_grading(GradeReference(
+                name='labtest', grade=3, lower=10 + lower, units='mg/dL', gender=[MALE],
+                age_lower=lower, age_upper=upper, age_units='years',
+                age_lower_inclusive=True))
+        LabResult.objects.all().delete()
+        for dob in [date(2000, 1, 15), date(2000, 1, 16), date(2000, 1, 14)]:
+            LabResult.objects.create(
+                name='labtest', value=30, units='mg/dL', gender=MALE, dob=dob,
+                report_datetime=report_datetime)
+        queryset = annotate_grade(LabResult.objects.order_by('dob'), grp, alias='graded')
+        self.assertEqual([obj.graded_age for obj in queryset], [18, 18, 17])
+        self.assertEqual([obj.graded for obj in queryset], [3, 3, 3])
+        queryset = annotate_grade(
+            LabResult.objects.all(), grp, alias='graded',
+            report_datetime=report_datetime + relativedelta(years=1))
+        self.assertEqual({obj.graded_age for obj in queryset}, {18, 19})
+
+    def test_age_units(self):
+        grp = ValueReferenceGroup(name='labtest')
+        grp.add_normal(NormalReference(
+            name='labtest', lower=10, units='mg/dL', gender=[FEMALE],
+            age_lower=6, age_units='months'))
+        self.assertRaises(ExpressionError, ExpressionCompiler(grp).normal)
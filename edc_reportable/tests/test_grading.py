@@ -7,7 +7,10 @@ from pytz import utc
 from unittest import TestCase
 
 from ..grade_reference import GradeReference, GradeError
+from ..normal_reference import NormalReference
+from ..parsers import parse
 from ..value_reference_group import NotEvaluated, ValueReferenceGroup, BoundariesOverlap
+from ..value_reference_group import ValueReferenceNotFound
 
 
 class TestGrading(TestCase):
@@ -134,3 +137,42 @@ class TestGrading(TestCase):
             value=16, gender=MALE,
             dob=dob, report_datetime=report_datetime,
             units='mg/dL')
+
+    def test_relative_grading(self):
+        report_datetime = utc.localize(datetime(2017, 12, 7))
+        dob = report_datetime - relativedelta(years=25)
+        grp = ValueReferenceGroup(name='creatinine')
+        opts = dict(name='creatinine', units='mg/dL', age_lower=18,
+                    age_units='years', age_lower_inclusive=True)
+        g3 = GradeReference(
+            grade=3, gender=[MALE, FEMALE],
+            **parse('1.8*ULN<=x<3.5*ULN', **opts))
+        self.assertTrue(g3.relative)
+        self.assertEqual(g3.description(), '1.8*ULN<=x<3.5*ULN mg/dL GRADE 3')
+        self.assertRaises(ValueReferenceNotFound, grp.add_grading, g3)
+
+        grp.add_normal(NormalReference(gender=MALE, **parse('0.6<=x<=1.3', **opts)))
+        grp.add_normal(NormalReference(gender=FEMALE, **parse('0.5<=x<=1.1', **opts)))
+        grp.add_grading(g3)
+        grp.validate()
+        self.assertEqual(
+            sorted(ref.description() for refs in grp.grading.values() for ref in refs),
+            ['1.98<=x<3.85 mg/dL GRADE 3', '2.34<=x<4.55 mg/dL GRADE 3'])
+        opts = dict(units='mg/dL', dob=dob, report_datetime=report_datetime)
+        self.assertEqual(grp.get_grade(value=2.4, gender=MALE, **opts).grade, 3)
+        self.assertIsNone(grp.get_grade(value=2.3, gender=MALE, **opts))
+        self.assertEqual(grp.get_grade(value=2.0, gender=FEMALE, **opts).grade, 3)
+
+    def test_relative_age_range(self):
+        grp = ValueReferenceGroup(name='alt')
+        grp.add_normal(NormalReference(
+            name='alt', units='IU/L', gender=MALE, age_lower=18, age_upper=60,
+            age_units='years', age_lower_inclusive=True, **parse('10<=x<=40')))
+        grp.add_grading(GradeReference(
+            name='alt', units='IU/L', gender=MALE, grade=4, age_lower=50,
+            age_units='years', age_lower_inclusive=True, **parse('10*ULN<=x')))
+        ref = grp.grading[MALE][0]
+        self.assertEqual(ref.lower, 400)
+        self.assertEqual((ref.age_lower, ref.age_upper), (50, 60))
+        self.assertEqual(ref.upper_relative, None)
+        self.assertFalse(ref.relative)
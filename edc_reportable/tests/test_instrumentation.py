@@ -0,0 +1,71 @@
+from dateutil.relativedelta import relativedelta
+from edc_constants.constants import MALE
+from unittest import TestCase
+
+from ..grade_reference import GradeReference
+from ..instrumentation import CallbackSink, InMemorySink, instrument
+from ..normal_reference import NormalReference
+from ..parsers import parse as p
+from ..site_reportables import Reportables
+from ..value_reference_group import BoundariesOverlap, NotEvaluated, ValueReferenceGroup
+
+
+class TestInstrumentation(TestCase):
+
+    def setUp(self):
+        self.grp = ValueReferenceGroup(name='labtest')
+        opts = dict(name='labtest', units='mg/dL', age_lower=18,
+                    age_units='years', age_lower_inclusive=True, gender=MALE)
+        self.grp.add_normal(NormalReference(lower=10, upper=20, **opts))
+        self.grp.add_grading(GradeReference(grade=3, lower=30, upper=40, **opts))
+        self.grp.add_grading(GradeReference(grade=4, lower=40, **opts))
+        self.opts = dict(units='mg/dL', gender=MALE, rdelta=relativedelta(years=25))
+
+    def test_disabled_uses_class_methods(self):
+        self.assertNotIn('get_grade', self.grp.__dict__)
+
+    def test_counters(self):
+        reportables = Reportables()
+        reportables.register(name='test', normal_data={}, grading_data={})
+        reportables.get('test').register(self.grp)
+        sink = reportables.enable_instrumentation(sample_every=1)
+        self.grp.get_grade(value=35, **self.opts)
+        self.grp.get_grade(value=45, **self.opts)
+        self.grp.get_grade(value=15, **self.opts)
+        self.grp.get_normal(value=15, **self.opts)
+        self.assertRaises(
+            NotEvaluated, self.grp.get_grade, value=35, units='mg/dL',
+            gender=MALE, rdelta=relativedelta(years=10))
+        stats = sink.snapshot()['test']['labtest']
+        self.assertEqual(stats['grading']['calls'], 4)
+        self.assertEqual(stats['grading']['matches'], 2)
+        self.assertEqual(stats['grading']['misses'], {'no_match': 1, 'not_evaluated': 1})
+        self.assertEqual(stats['grading']['candidates'], 6)
+        self.assertEqual(stats['grading']['sampled'], 4)
+        self.assertEqual(sum(stats['grading']['latency'].values()), 4)
+        self.assertEqual(stats['normal']['matches'], 1)
+
+        reportables.disable_instrumentation()
+        self.grp.get_grade(value=35, **self.opts)
+        self.assertEqual(sink.snapshot()['test']['labtest']['grading']['calls'], 4)
+        self.assertNotIn('get_grade', self.grp.__dict__)
+
+    def test_register_overlap(self):
+        events = []
+        reportables = Reportables()
+        reportables.enable_instrumentation(sink=CallbackSink(events.append))
+        opts = dict(units='mg/dL', gender=MALE, age_lower=18,
+                    age_units='years', age_lower_inclusive=True)
+        self.assertRaises(
+            BoundariesOverlap, reportables.register, name='test',
+            normal_data={'labtest': [p('10<=x<=20', **opts), p('15<=x<=25', **opts)]},
+            grading_data={})
+        self.assertEqual([(e.kind, e.outcome) for e in events], [('register', 'overlap')])
+
+    def test_in_memory_sink_reset(self):
+        sink = InMemorySink()
+        instrument(self.grp, sink)
+        self.grp.get_grade(value=35, **self.opts)
+        self.assertEqual(sink.snapshot()[None]['labtest']['grading']['sampled'], 1)
+        sink.reset()
+        self.assertEqual(sink.snapshot(), {})
@@ -0,0 +1,66 @@
+from dateutil.relativedelta import relativedelta
+from edc_constants.constants import MALE
+from threading import Thread
+from unittest import TestCase
+
+from ..parsers import parse as p
+from ..reference_collection import AlreadyRegistered, ReferenceCollection
+from ..site_reportables import Reportables, build_group
+from ..value_reference_group import BoundariesOverlap
+
+
+class TestLazy(TestCase):
+
+    def setUp(self):
+        opts = dict(units='mg/dL', gender=[MALE], age_lower=18, age_units='years')
+        self.normal_data = {
+            'labtest1': [p('10<=x<=20', **opts)],
+            'labtest2': [p('10<=x<=20', **opts)],
+            'overlaps': [p('10<=x<=20', **opts), p('15<=x<=25', **opts)]}
+        self.grading_data = {'labtest1': [p('30<=x', grade=3, **opts)]}
+        self.opts = dict(units='mg/dL', gender=MALE, rdelta=relativedelta(years=25))
+
+    def test_register_lazy(self):
+        reportables = Reportables()
+        reportables.register(
+            name='test', normal_data=self.normal_data,
+            grading_data=self.grading_data, lazy=True)
+        reference_collection = reportables.get('test')
+        self.assertEqual(reference_collection.registry, {})
+        grp = reference_collection.get('labtest1')
+        self.assertTrue(grp.validated)
+        self.assertEqual(grp.get_grade(value=35, **self.opts).grade, 3)
+        self.assertEqual(list(reference_collection.registry), ['labtest1'])
+        self.assertIs(reference_collection.get('labtest1'), grp)
+        self.assertIsNone(reference_collection.get('unknown'))
+        self.assertRaises(BoundariesOverlap, reference_collection.get, 'overlaps')
+        self.assertRaises(BoundariesOverlap, reportables.warm)
+        self.assertIn('labtest2', reference_collection.registry)
+
+    def test_options_apply_to_lazy_groups(self):
+        reference_collection = ReferenceCollection(name='test')
+        reference_collection.register_lazy(
+            'labtest1', lambda: build_group('labtest1', self.normal_data['labtest1'], []))
+        reference_collection.enable_cache(maxsize=5)
+        self.assertEqual(reference_collection.get('labtest1').cache.maxsize, 5)
+        self.assertRaises(
+            AlreadyRegistered, reference_collection.register_lazy, 'labtest1', None)
+
+    def test_built_once(self):
+        built = []
+
+        def build():
+            built.append(1)
+            return build_group('labtest1', self.normal_data['labtest1'], [])
+
+        reference_collection = ReferenceCollection(name='test')
+        reference_collection.register_lazy('labtest1', build)
+        groups = []
+        threads = [Thread(target=lambda: groups.append(reference_collection.get('labtest1')))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(built), 1)
+        self.assertEqual(len({id(grp) for grp in groups}), 1)
@@ -0,0 +1,53 @@
+from edc_constants.constants import MALE, FEMALE
+from unittest import TestCase
+
+from ..streaming import GradeResult
+from ..site_reportables import Reportables
+from ..value_reference_group import NotEvaluated
+from .reportables import normal_data, grading_data
+from .results import make_results
+
+
+class TestParallel(TestCase):
+
+    def setUp(self):
+        reportables = Reportables()
+        reportables.register(
+            name='test', normal_data=normal_data, grading_data=grading_data, lazy=True)
+        self.reference_collection = reportables.get('test')
+        self.records = make_results(count=200, seed=1)
+
+    def expected(self):
+        expected = []
+        for name, value, units, gender, dob, report_datetime in self.records:
+            grade = self.reference_collection.get(name).get_grade(
+                value=value, units=units, gender=gender, dob=dob,
+                report_datetime=report_datetime)
+            expected.append(GradeResult(grade and grade.grade, None, None))
+        return expected
+
+    def test_in_process(self):
+        results = self.reference_collection.grade_parallel(
+            self.records, chunk_size=7, max_workers=1)
+        self.assertEqual(results, self.expected())
+
+    def test_process_pool(self):
+        results = self.reference_collection.grade_parallel(
+            iter(self.records), chunk_size=7, max_workers=2)
+        self.assertEqual(results, self.expected())
+        self.assertEqual({r.grade for r in results}, {None, 3, 4})
+
+    def test_errors(self):
+        records = list(self.records[:20])
+        name, value, units, _, dob, report_datetime = records[5]
+        records[5] = (name, value, 'g/L', MALE, dob, report_datetime)
+        records[15] = ('unknown', value, units, FEMALE, dob, report_datetime)
+        for max_workers in [1, 2]:
+            results = self.reference_collection.grade_parallel(
+                records, chunk_size=4, max_workers=max_workers)
+            self.assertEqual(
+                [index for index, result in enumerate(results) if result.error], [5, 15])
+            with self.assertRaises(NotEvaluated) as cm:
+                self.reference_collection.grade_parallel(
+                    records, chunk_size=4, max_workers=max_workers, raise_errors=True)
+            self.assertTrue(str(cm.exception).startswith('Record 5.'))
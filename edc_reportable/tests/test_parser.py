@@ -1,7 +1,7 @@
 from django.test import TestCase, tag
 from edc_constants.constants import MALE
 
-from ..parsers import parse, unparse, ParserError
+from ..parsers import parse, parse_many, unparse, ParserError, ULN, LLN
 
 
 class TestParser(TestCase):
@@ -75,6 +75,53 @@ class TestParser(TestCase):
         p = parse('0.77 <= x <= 0.88')
         self.assertEqual(unparse(gender=MALE, **p), '0.77<=x<=0.88 M')
 
+    def test_relative(self):
+        p = parse('1.25*ULN <= x < 2.5*ULN')
+        self.assertEqual(p.lower, 1.25)
+        self.assertEqual(p.lower_relative, ULN)
+        self.assertTrue(p.lower_inclusive)
+        self.assertEqual(p.upper, 2.5)
+        self.assertEqual(p.upper_relative, ULN)
+        self.assertEqual(unparse(**p), '1.25*ULN<=x<2.5*ULN')
+        p = parse('x<0.6*LLN')
+        self.assertIsNone(p.lower_relative)
+        self.assertEqual(p.upper_relative, LLN)
+        p = parse('7<x<8')
+        self.assertNotIn('lower_relative', p)
+        self.assertRaises(ParserError, parse, '1.25*ULN')
+        self.assertRaises(ParserError, parse, '1.25*XLN<x')
+
+    def test_full_phrase(self):
+        for phrase in ['13.5<=x<=17.5 M 18<=AGE', '1.25*ULN<=x<2.5*ULN MF 18<=AGE<65',
+                       'x<0.6*LLN F', '0.5<x  AGE<=18']:
+            self.assertEqual(unparse(**parse(phrase)), phrase)
+        p = parse('13.5 <= x <= 17.5 MF 18 <= AGE < 65')
+        self.assertEqual(p.gender, 'MF')
+        self.assertEqual((p.age_lower, p.age_upper), (18, 65))
+        self.assertTrue(p.age_lower_inclusive)
+        self.assertIsNone(p.age_upper_inclusive)
+        self.assertEqual(parse('7<x M', gender=[MALE]).gender, [MALE])
+        self.assertNotIn('gender', parse('7<x'))
+        self.assertRaises(ParserError, parse, '7<x G')
+        self.assertRaises(ParserError, parse, '7<x M 18<=AGE=<65')
+
+    def test_parse_is_not_shared(self):
+        p = parse('7<x<8')
+        p.update(lower=1)
+        self.assertEqual(parse('7<x<8').lower, 7)
+
+    def test_parse_many(self):
+        references = parse_many(
+            '# haemoglobin\n'
+            '13.5<=x<=17.5 M 18<=AGE\n'
+            '\n'
+            '12.0<=x<=16.0 F 18<=AGE\n', units='g/dL', age_units='years')
+        self.assertEqual([p.gender for p in references], ['M', 'F'])
+        self.assertEqual(references[1].units, 'g/dL')
+        with self.assertRaises(ParserError) as cm:
+            parse_many(['7<x', '7<x<'])
+        self.assertIn('Line 2', str(cm.exception))
+
     def test11(self):
         self.assertRaises(
             ParserError,
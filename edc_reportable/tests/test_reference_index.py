@@ -0,0 +1,109 @@
+from dateutil.relativedelta import relativedelta
+from edc_constants.constants import MALE, FEMALE
+from operator import attrgetter
+from unittest import TestCase
+
+from ..grade_reference import GradeReference
+from ..normal_reference import NormalReference
+from ..reference_index import ReferenceIndex
+from ..value_reference_group import BoundariesOverlap, ValueReferenceGroup
+
+
+class TestReferenceIndex(TestCase):
+
+    def setUp(self):
+        self.index = ReferenceIndex()
+        self.refs = {}
+        for age_lower, age_upper in [(1, 5), (5, 12), (12, 18), (18, None)]:
+            ref = NormalReference(
+                name='labtest', lower=10, upper=20, units='mg/dL',
+                age_lower=age_lower, age_upper=age_upper, age_units='years',
+                age_lower_inclusive=True, gender=[MALE, FEMALE])
+            self.index.add(ref)
+            self.refs[age_lower] = ref
+
+    def test_age_bands(self):
+        for years, age_lower in [(1, 1), (4, 1), (5, 5), (11, 5), (12, 12),
+                                 (17, 12), (18, 18), (80, 18)]:
+            with self.subTest(years=years):
+                self.assertEqual(
+                    self.index.get(units='mg/dL', gender=MALE,
+                                   rdelta=relativedelta(years=years)),
+                    (self.refs[age_lower], ))
+
+    def test_not_found(self):
+        self.assertEqual(
+            self.index.get(units='mg/dL', gender=MALE,
+                           rdelta=relativedelta(years=0)), ())
+        self.assertEqual(
+            self.index.get(units='mmol/L', gender=MALE,
+                           rdelta=relativedelta(years=25)), ())
+        self.assertEqual(
+            self.index.get(units='mg/dL', gender='X',
+                           rdelta=relativedelta(years=25)), ())
+
+    def test_gender(self):
+        ref = NormalReference(
+            name='labtest', lower=10, upper=20, units='mg/dL',
+            age_lower=18, age_units='years', age_lower_inclusive=True,
+            gender=FEMALE)
+        self.index.add(ref)
+        rdelta = relativedelta(years=25)
+        self.assertEqual(
+            self.index.get(units='mg/dL', gender=MALE, rdelta=rdelta),
+            (self.refs[18], ))
+        self.assertEqual(
+            self.index.get(units='mg/dL', gender=FEMALE, rdelta=rdelta),
+            (self.refs[18], ref))
+
+    def test_sort_key(self):
+        index = ReferenceIndex(sort_key=attrgetter('grade'), reverse=True)
+        opts = dict(name='labtest', units='mg/dL', age_lower=18,
+                    age_units='years', age_lower_inclusive=True, gender=MALE)
+        g3 = GradeReference(grade=3, lower=20, upper=30, **opts)
+        g4 = GradeReference(grade=4, lower=30, **opts)
+        g2 = GradeReference(grade=2, lower=10, upper=20, **opts)
+        for ref in [g3, g4, g2]:
+            index.add(ref)
+        self.assertEqual(
+            index.get(units='mg/dL', gender=MALE, rdelta=relativedelta(years=25)),
+            (g4, g3, g2))
+
+    def test_tables_built_on_lookup(self):
+        index = ReferenceIndex()
+        refs = []
+        for days in range(0, 1200, 3):
+            ref = NormalReference(
+                name='labtest', lower=10, upper=20, units='mg/dL',
+                age_lower=days, age_upper=days + 3, age_units='days',
+                age_lower_inclusive=True, gender=MALE)
+            index.add(ref)
+            refs.append(ref)
+        self.assertEqual(index._tables, {})
+        self.assertEqual(
+            index.get(units='mg/dL', gender=MALE, rdelta=relativedelta(days=601)),
+            (refs[200], ))
+        self.assertEqual(index.overlaps(), [])
+        ref = NormalReference(
+            name='labtest', lower=15, upper=25, units='mg/dL',
+            age_lower=600, age_upper=603, age_units='days',
+            age_lower_inclusive=True, gender=MALE)
+        index.add(ref)
+        self.assertEqual(index.overlaps(), [(refs[200], ref)])
+
+    def test_overlaps_across_age_units(self):
+        index = ReferenceIndex()
+        opts = dict(name='labtest', lower=10, upper=20, units='mg/dL', gender=MALE,
+                    age_lower_inclusive=True)
+        neonate = NormalReference(age_lower=0, age_upper=28, age_units='days', **opts)
+        infant = NormalReference(age_lower=0, age_upper=1, age_units='years', **opts)
+        child = NormalReference(age_lower=1, age_upper=5, age_units='years', **opts)
+        for ref in [neonate, child]:
+            index.add(ref)
+        self.assertEqual(index.overlaps(), [])
+        index.add(infant)
+        self.assertEqual(index.overlaps(), [(neonate, infant)])
+        grp = ValueReferenceGroup(name='labtest')
+        for ref in [neonate, infant]:
+            grp.add_normal(ref)
+        self.assertRaises(BoundariesOverlap, grp.validate)
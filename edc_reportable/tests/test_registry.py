@@ -0,0 +1,87 @@
+from dateutil.relativedelta import relativedelta
+from edc_constants.constants import MALE
+from threading import Event, Thread
+from unittest import TestCase
+
+from ..parsers import parse as p
+from ..site_reportables import Reportables
+from ..value_reference_group import BoundariesOverlap
+
+
+class TestRegistry(TestCase):
+
+    def setUp(self):
+        self.opts = dict(units='mg/dL', gender=[MALE], age_lower=18, age_units='years')
+        self.eval_opts = dict(units='mg/dL', gender=MALE, rdelta=relativedelta(years=25))
+
+    def normal_data(self, upper):
+        return {'labtest': [p(f'10<=x<={upper}', **self.opts)]}
+
+    def test_registry_is_read_only(self):
+        reportables = Reportables()
+        reportables.register(name='test', normal_data=self.normal_data(20), grading_data={})
+        with self.assertRaises(TypeError):
+            reportables.registry['test'] = None
+        with self.assertRaises(TypeError):
+            reportables.get('test').registry['labtest'] = None
+
+    def test_register_does_not_change_registered_collection(self):
+        reportables = Reportables()
+        reportables.register(name='test', normal_data=self.normal_data(20), grading_data={})
+        registry = reportables.registry
+        reference_collection = reportables.get('test')
+        reportables.register(
+            name='test', normal_data={'other': [p('1<=x<=2', **self.opts)]},
+            grading_data={'labtest': [p('30<=x', grade=3, **self.opts)]})
+        self.assertIs(registry['test'], reference_collection)
+        self.assertEqual(list(reference_collection.registry), ['labtest'])
+        self.assertEqual(reference_collection.get('labtest').grading, {})
+        self.assertEqual(list(reportables.get('test').registry), ['labtest', 'other'])
+        self.assertEqual(
+            reportables.get('test').get('labtest').get_grade(
+                value=35, **self.eval_opts).grade, 3)
+
+    def test_reload(self):
+        reportables = Reportables()
+        reportables.register(name='test', normal_data=self.normal_data(20), grading_data={})
+        reportables.get('test').enable_cache(maxsize=10)
+        grp = reportables.get('test').get('labtest')
+        self.assertIsNone(grp.get_normal(value=25, **self.eval_opts))
+        reportables.reload(name='test', normal_data=self.normal_data(30), grading_data={})
+        new_grp = reportables.get('test').get('labtest')
+        self.assertTrue(new_grp.get_normal(value=25, **self.eval_opts))
+        self.assertEqual(new_grp.cache.maxsize, 10)
+        self.assertIsNone(grp.get_normal(value=25, **self.eval_opts))
+
+        # an invalid reload leaves the registered collection in place
+        self.assertRaises(
+            BoundariesOverlap, reportables.reload, name='test',
+            normal_data={'labtest': [p('10<=x<=20', **self.opts),
+                                     p('15<=x<=25', **self.opts)]},
+            grading_data={})
+        self.assertIs(reportables.get('test').get('labtest'), new_grp)
+
+    def test_readers_during_reload(self):
+        reportables = Reportables()
+        reportables.register(name='test', normal_data=self.normal_data(20), grading_data={})
+        stop = Event()
+        errors = []
+
+        def read():
+            while not stop.is_set():
+                try:
+                    reportables.get('test').get('labtest').get_normal(
+                        value=15, **self.eval_opts)
+                except Exception as e:
+                    errors.append(e)
+
+        readers = [Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for upper in range(21, 41):
+            reportables.reload(
+                name='test', normal_data=self.normal_data(upper), grading_data={})
+        stop.set()
+        for reader in readers:
+            reader.join()
+        self.assertEqual(errors, [])
@@ -0,0 +1,95 @@
+import json
+import os
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from io import StringIO
+from tempfile import mkdtemp
+
+from ..site_reportables import site_reportables
+from .models import LabResult
+from .reportables import normal_data, grading_data
+from .results import make_results
+
+
+class TestRegrade(TestCase):
+
+    def setUp(self):
+        site_reportables.reload(
+            name='regrade', normal_data=normal_data, grading_data=grading_data)
+        self.reference_collection = site_reportables.get('regrade')
+        records = make_results(count=98, seed=5)
+        _, _, _, gender, dob, report_datetime = records[0]
+        records[10:10] = [('cd4', 300, 'cells/mm^3', gender, dob, report_datetime)]
+        records[60:60] = [('cd4', 500, 'cells/mm^3', gender, dob, report_datetime)]
+        LabResult.objects.bulk_create([
+            LabResult(name=name, value=value, units=units, gender=gender,
+                      dob=dob.date(), report_datetime=report_datetime)
+            for name, value, units, gender, dob, report_datetime in records])
+        self.path = mkdtemp()
+        self.checkpoint = os.path.join(self.path, 'checkpoint.json')
+
+    def tearDown(self):
+        os.rmdir(self.path)
+
+    def expected(self):
+        records = [(obj.name, obj.value, obj.units, obj.gender, obj.dob, obj.report_datetime)
+                   for obj in LabResult.objects.order_by('pk')]
+        return [(result.grade, result.normal) for result in
+                self.reference_collection.grade_stream(records, normal=True)
+                if not result.error]
+
+    def regrade(self, *args):
+        stdout = StringIO()
+        call_command('regrade', 'tests.labresult', '--collection', 'regrade',
+                     '--normal-field', 'normal', '--chunk-size', '7', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_regrade(self):
+        expected = self.expected()
+        output = self.regrade()
+        self.assertIn('of 100 rows', output)
+        graded = [(obj.grade, obj.normal) for obj in LabResult.objects.order_by('pk')
+                  if obj.name != 'cd4']
+        self.assertEqual(graded, expected)
+        self.assertIn('Changed 0 of 100 rows', self.regrade())
+
+    def test_errors(self):
+        pks = list(LabResult.objects.order_by('pk').values_list('pk', flat=True))
+        LabResult.objects.filter(pk__in=pks[20:22]).update(value=None)
+        output = self.regrade('--checkpoint', self.checkpoint)
+        self.assertIn('of 100 rows. 4 rows not evaluated, left unchanged.', output)
+        self.assertFalse(os.path.exists(self.checkpoint))
+        self.assertEqual(LabResult.objects.filter(value=None).exclude(normal=None).count(), 0)
+
+        LabResult.objects.filter(pk__in=pks[20:22]).update(grade=4)
+        output = self.regrade('--clear-errors')
+        self.assertIn('Changed 2 of 100 rows. 4 rows not evaluated, cleared.', output)
+        self.assertEqual(LabResult.objects.filter(value=None).exclude(grade=None).count(), 0)
+
+    def test_dry_run(self):
+        output = self.regrade('--dry-run')
+        self.assertIn('Would change', output)
+        self.assertIn('(None, None) -> (', output)
+        self.assertEqual(LabResult.objects.exclude(grade=None).count(), 0)
+
+    def test_resume_from_checkpoint(self):
+        pks = list(LabResult.objects.order_by('pk').values_list('pk', flat=True))
+        with open(self.checkpoint, 'w') as f:
+            json.dump(dict(model='tests.labresult', collection='regrade',
+                           last_pk=pks[49]), f)
+        self.assertIn('of 50 rows', self.regrade('--checkpoint', self.checkpoint))
+        self.assertFalse(os.path.exists(self.checkpoint))
+        self.assertEqual(LabResult.objects.filter(pk__lte=pks[49]).exclude(
+            normal=None).count(), 0)
+
+        with open(self.checkpoint, 'w') as f:
+            json.dump(dict(model='tests.other', collection='regrade', last_pk=1), f)
+        self.assertRaises(CommandError, self.regrade, '--checkpoint', self.checkpoint)
+        os.remove(self.checkpoint)
+
+    def test_unknown_collection(self):
+        self.assertRaises(
+            CommandError, call_command, 'regrade', 'tests.labresult',
+            '--collection', 'unknown')
@@ -0,0 +1,26 @@
+from unittest import TestCase
+
+from ..value_reference_group import Grade, Normal
+
+
+class TestResult(TestCase):
+
+    def test_description_is_lazy(self):
+        calls = []
+
+        def description(value=None):
+            calls.append(value)
+            return f'10<={value}<20'
+
+        grade = Grade(15, 3, description)
+        self.assertEqual(grade.grade, 3)
+        self.assertTrue(grade)
+        self.assertEqual(calls, [])
+        self.assertEqual(grade.description, '10<=15<20')
+        self.assertEqual(str(grade), '10<=15<20')
+        self.assertEqual(calls, [15])
+
+    def test_slots(self):
+        normal = Normal(15, str)
+        self.assertRaises(AttributeError, setattr, normal, 'extra', 1)
+        self.assertFalse(hasattr(normal, '__dict__'))
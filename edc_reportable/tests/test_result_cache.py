@@ -0,0 +1,52 @@
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from edc_constants.constants import MALE
+from pytz import utc
+from unittest import TestCase
+
+from ..grade_reference import GradeReference
+from ..result_cache import MISSING, ResultCache
+from ..value_reference_group import NotEvaluated, ValueReferenceGroup
+
+
+class TestResultCache(TestCase):
+
+    def test_lru(self):
+        cache = ResultCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', None)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertIs(cache.get('b'), MISSING)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.info(), dict(hits=3, misses=1, size=2, maxsize=2))
+
+    def test_group_cache(self):
+        report_datetime = utc.localize(datetime(2017, 12, 7))
+        grp = ValueReferenceGroup(name='labtest')
+        opts = dict(name='labtest', units='mg/dL', age_lower=18,
+                    age_units='years', age_lower_inclusive=True, gender=MALE)
+        grp.add_grading(GradeReference(grade=3, lower=20, upper=30, **opts))
+        grp.enable_cache(maxsize=10)
+        for years in [25, 40, 60]:
+            grade = grp.get_grade(
+                value=25, units='mg/dL', gender=MALE,
+                dob=report_datetime - relativedelta(years=years),
+                report_datetime=report_datetime)
+            self.assertEqual(grade.grade, 3)
+        self.assertEqual((grp.cache.hits, grp.cache.misses), (2, 1))
+
+        # younger subject is in another age band
+        self.assertRaises(
+            NotEvaluated, grp.get_grade, value=25, units='mg/dL', gender=MALE,
+            dob=report_datetime - relativedelta(years=10),
+            report_datetime=report_datetime)
+        self.assertEqual(grp.cache.misses, 2)
+
+        grp.add_grading(GradeReference(grade=4, lower=30, **opts))
+        self.assertEqual(len(grp.cache), 0)
+        grade = grp.get_grade(
+            value=35, units='mg/dL', gender=MALE,
+            rdelta=relativedelta(years=25))
+        self.assertEqual(grade.grade, 4)
@@ -1,10 +1,14 @@
+import os
+
 from dateutil.relativedelta import relativedelta
 from django.test.testcases import TestCase
 from edc_base.utils import get_utcnow
 from edc_constants.constants import MALE
 from tempfile import mkdtemp
 
-from ..site_reportables import site_reportables
+from ..parsers import parse as p
+from ..site_reportables import site_reportables, ReadCsvError
+from ..value_reference_group import BoundariesOverlap
 from .reportables import normal_data, grading_data
 
 
@@ -22,6 +26,48 @@ class TestSiteReportables(TestCase):
         path = mkdtemp()
         site_reportables.to_csv(collection_name='my_project', path=path)
 
+    def test_read_csv(self):
+        path = mkdtemp()
+        filename1, filename2 = site_reportables.to_csv(
+            collection_name='my_project', path=path)
+        os.rename(filename1, os.path.join(path, 'copy_normal_ranges.csv'))
+        os.rename(filename2, os.path.join(path, 'copy_grading.csv'))
+        reference_collection = site_reportables.read_csv(name='copy', path=path)
+        self.assertIs(site_reportables.get('copy'), reference_collection)
+        self.assertEqual(
+            reference_collection.as_data(),
+            site_reportables.get('my_project').as_data())
+
+        # description only
+        with open(os.path.join(path, 'short_normal_ranges.csv'), 'w') as f:
+            f.write('name,description,units,gender,age_lower,age_units,'
+                    'age_lower_inclusive\n'
+                    'haemoglobin,13.5<=x<=17.5 M 18<=AGE,g/dL,M,18,years,True\n')
+        site_reportables.read_csv(name='short', path=path)
+        normal = site_reportables.get('short').get('haemoglobin').get_normal(
+            value=15.0, units='g/dL', gender=MALE,
+            dob=get_utcnow() - relativedelta(years=25))
+        self.assertIn('13.5<=15.0<=17.5', normal.description)
+
+        # gender and age from the description
+        with open(os.path.join(path, 'phrase_normal_ranges.csv'), 'w') as f:
+            f.write('name,description,units,age_units\n'
+                    'haemoglobin,13.5<=x<=17.5 M 18<=AGE,g/dL,years\n')
+        site_reportables.read_csv(name='phrase', path=path)
+        normal = site_reportables.get('phrase').get('haemoglobin').get_normal(
+            value=15.0, units='g/dL', gender=MALE,
+            dob=get_utcnow() - relativedelta(years=25))
+        self.assertIn('13.5<=15.0<=17.5', normal.description)
+
+        with open(os.path.join(path, 'bad_normal_ranges.csv'), 'w') as f:
+            f.write('name,description,units,gender,age_lower,age_units,'
+                    'age_lower_inclusive\n'
+                    'haemoglobin,13.5<=x<=17.5 M 18<=AGE,g/dL,M,18,years,True\n'
+                    'haemoglobin,17.5<=x<=13.5 F 18<=AGE,g/dL,F,18,years,True\n')
+        with self.assertRaises(ReadCsvError) as cm:
+            site_reportables.read_csv(name='bad', path=path)
+        self.assertIn('line 3', str(cm.exception))
+
     def test_(self):
         reportables = site_reportables.get('my_project')
         haemoglobin = reportables.get('haemoglobin')
@@ -40,3 +86,30 @@ class TestSiteReportables(TestCase):
             value=15, units='g/dL', gender=MALE,
             dob=get_utcnow() - relativedelta(years=25))
         self.assertIsNone(grade)
+
+    def test_register_validates(self):
+        reportables = site_reportables.get('my_project')
+        self.assertTrue(reportables.get('haemoglobin').validated)
+
+        age_opts = dict(age_lower=18, age_units='years', age_lower_inclusive=True)
+        normal_data = {
+            'labtest': [
+                p('10<=x<=20', units='mg/dL', gender=[MALE], **age_opts),
+                p('20<=x<=30', units='mg/dL', gender=[MALE], **age_opts),
+                p('25<x', units='mg/dL', gender=[MALE], **age_opts),
+                p('30<x', units='mg/dL', gender=[MALE], **age_opts)]}
+        grading_data = {
+            'labtest': [
+                p('30<=x', grade=3, units='mg/dL', gender=[MALE], **age_opts),
+                p('40<=x', grade=4, units='mg/dL', gender=[MALE], **age_opts)]}
+        with self.assertRaises(BoundariesOverlap) as cm:
+            site_reportables.register(
+                name='another_project', normal_data=normal_data,
+                grading_data=grading_data)
+        message = str(cm.exception)
+        self.assertIn('10.0<=x<=20.0 mg/dL M overlaps 20.0<=x<=30.0 mg/dL M', message)
+        self.assertIn('20.0<=x<=30.0 mg/dL M overlaps 25.0<x mg/dL M', message)
+        self.assertIn('25.0<x mg/dL M overlaps 30.0<x mg/dL M', message)
+        self.assertIn('30.0<=x mg/dL GRADE 3 overlaps 40.0<=x mg/dL GRADE 4', message)
+        self.assertNotIn('10.0<=x<=20.0 mg/dL M overlaps 25.0<x', message)
+        self.assertIsNone(site_reportables.get('another_project'))
@@ -0,0 +1,109 @@
+import os
+import pickle
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+from edc_constants.constants import MALE, FEMALE
+from tempfile import mkdtemp
+from unittest import mock
+
+from ..grade_reference import GradeReference
+from ..parsers import parse as p
+from ..site_reportables import Reportables
+from ..snapshots import SnapshotError, StaleSnapshot, definitions_hash, dump, load
+from .reportables import normal_data, grading_data
+
+
+class TestSnapshots(TestCase):
+
+    def setUp(self):
+        self.path = mkdtemp()
+        self.opts = dict(units='mg/dL', gender=MALE, rdelta=relativedelta(years=25))
+
+    def tearDown(self):
+        for filename in os.listdir(self.path):
+            os.remove(os.path.join(self.path, filename))
+        os.rmdir(self.path)
+
+    def test_pickle_reference(self):
+        ref = GradeReference(
+            name='labtest', grade=3, lower=10, upper=20, units='mg/dL',
+            gender=[MALE, FEMALE], age_lower=18, age_units='years')
+        ref = pickle.loads(pickle.dumps(ref))
+        self.assertEqual(ref.grade, 3)
+        self.assertTrue(ref.in_bounds(15))
+        self.assertFalse(ref.in_bounds(25))
+        self.assertRaises(AttributeError, setattr, ref, 'grade', 4)
+
+    def test_snapshot_round_trip(self):
+        reportables = Reportables()
+        reportables.register(
+            name='my_project', normal_data=normal_data, grading_data=grading_data)
+        reportables.get('my_project').enable_cache(maxsize=10)
+        reportables.enable_instrumentation()
+        reportables.dump_snapshot(name='my_project', path=self.path)
+
+        loaded = Reportables()
+        reference_collection = loaded.load_snapshot(name='my_project', path=self.path)
+        self.assertEqual(reference_collection.as_data(),
+                         reportables.get('my_project').as_data())
+        grp = reference_collection.get('haemoglobin')
+        self.assertTrue(grp.validated)
+        self.assertNotIn('get_grade', grp.__dict__)
+        self.assertEqual(len(grp.cache), 0)
+        normal = grp.get_normal(
+            value=15.0, units='g/dL', gender=MALE, rdelta=relativedelta(years=25))
+        self.assertIn('13.5<=15.0<=17.5', normal.description)
+
+    def test_register_with_snapshot(self):
+        data = {'labtest': [p('10<=x<=20', units='mg/dL', gender=[MALE],
+                              age_lower=18, age_units='years')]}
+        reportables = Reportables()
+        reportables.register(
+            name='test', normal_data=data, grading_data={}, snapshot_path=self.path)
+        filename = os.path.join(self.path, 'test_snapshot.pickle')
+        key = definitions_hash(data, {})
+        self.assertIsNotNone(load(filename, key=key))
+
+        # unchanged definitions are loaded from the snapshot
+        reportables = Reportables()
+        reportables.register(
+            name='test', normal_data=data, grading_data={}, snapshot_path=self.path)
+        grp = reportables.get('test').get('labtest')
+        self.assertTrue(grp.get_normal(value=15, **self.opts))
+
+        # changed definitions are rebuilt
+        data = {'labtest': [p('10<=x<=30', units='mg/dL', gender=[MALE],
+                              age_lower=18, age_units='years')]}
+        self.assertRaises(StaleSnapshot, load, filename, key=definitions_hash(data, {}))
+        reportables = Reportables()
+        reportables.register(
+            name='test', normal_data=data, grading_data={}, snapshot_path=self.path)
+        grp = reportables.get('test').get('labtest')
+        self.assertTrue(grp.get_normal(value=25, **self.opts))
+        self.assertIsNotNone(load(filename, key=definitions_hash(data, {})))
+
+    def test_register_with_snapshot_from_other_code(self):
+        data = {'labtest': [p('10<=x<=20', units='mg/dL', gender=[MALE],
+                              age_lower=18, age_units='years')]}
+        reportables = Reportables()
+        reportables.register(
+            name='test', normal_data=data, grading_data={}, snapshot_path=self.path)
+        filename = os.path.join(self.path, 'test_snapshot.pickle')
+        key = definitions_hash(data, {})
+
+        # as if written before the evaluator, reference or index code changed
+        with mock.patch('edc_reportable.snapshots.code_version', return_value='3-old'):
+            dump(reportables.get('test'), filename, key=key)
+        self.assertRaises(StaleSnapshot, load, filename, key=key)
+
+        reportables = Reportables()
+        reportables.register(
+            name='test', normal_data=data, grading_data={}, snapshot_path=self.path)
+        grp = reportables.get('test').get('labtest')
+        self.assertTrue(grp.get_normal(value=15, **self.opts))
+        self.assertIsNotNone(load(filename, key=key))
+
+        with open(filename, 'wb') as f:
+            f.write(b'not a snapshot')
+        self.assertRaises(SnapshotError, load, filename)
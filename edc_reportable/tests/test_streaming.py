@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+from ..reference_collection import ReferenceCollection
+from ..site_reportables import Reportables
+from .reportables import normal_data, grading_data
+from .results import make_results
+
+
+class CountingCollection(ReferenceCollection):
+
+    def __init__(self, reference_collection):
+        super().__init__(name=reference_collection.name)
+        self.registry = reference_collection.registry
+        self.lookups = 0
+
+    def get(self, name):
+        self.lookups += 1
+        return super().get(name)
+
+
+class TestStreaming(TestCase):
+
+    def setUp(self):
+        reportables = Reportables()
+        reportables.register(
+            name='test', normal_data=normal_data, grading_data=grading_data)
+        self.reference_collection = reportables.get('test')
+
+    def test_grade_stream(self):
+        records = make_results(count=50, seed=2)
+        results = self.reference_collection.grade_stream(iter(records), normal=True)
+        self.assertEqual(next(results)._fields, ('grade', 'normal', 'error'))
+        for (name, value, units, gender, dob, report_datetime), result in zip(
+                records[1:], results):
+            grp = self.reference_collection.get(name)
+            opts = dict(value=value, units=units, gender=gender, dob=dob,
+                        report_datetime=report_datetime)
+            grade = grp.get_grade(**opts)
+            self.assertEqual(result.grade, grade and grade.grade)
+            self.assertEqual(result.normal, grp.get_normal(**opts) is not None)
+            self.assertIsNone(result.error)
+
+    def test_group_reused_for_consecutive_records(self):
+        records = sorted(make_results(count=30, seed=3))
+        reference_collection = CountingCollection(self.reference_collection)
+        results = list(reference_collection.grade_stream(records))
+        self.assertEqual(len(results), 30)
+        self.assertEqual(reference_collection.lookups, len({r[0] for r in records}))
+        self.assertEqual({result.normal for result in results}, {None})
+
+    def test_errors(self):
+        name, value, units, gender, dob, report_datetime = make_results(count=1)[0]
+        results = list(self.reference_collection.grade_stream([
+            ('unknown', value, units, gender, dob, report_datetime),
+            ('haemoglobin', value, 'IU/L', gender, dob, report_datetime),
+            ('haemoglobin', 15.0, 'g/dL', gender, None, report_datetime),
+            ('haemoglobin', None, 'g/dL', gender, dob, report_datetime),
+            ('haemoglobin', 'high', 'g/dL', gender, dob, report_datetime),
+            ('haemoglobin', 15.0, None, gender, dob, report_datetime),
+            ('haemoglobin', 15.0, 'g/dL', gender, dob, report_datetime)]))
+        self.assertIn('No reference group found', results[0].error)
+        self.assertIn('haemoglobin value not graded', results[1].error)
+        self.assertIn('Date of birth is required', results[2].error)
+        self.assertIn('Value is required', results[3].error)
+        self.assertIn('Invalid value', results[4].error)
+        self.assertIn('Units are required', results[5].error)
+        self.assertIsNone(results[6].error)
@@ -0,0 +1,116 @@
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from edc_constants.constants import MALE, FEMALE
+from pytz import utc
+from unittest import TestCase, mock, skipIf
+
+from ..grade_reference import GradeReference
+from ..normal_reference import NormalReference
+from ..parsers import ULN
+from ..units import ConversionNotFound, UnitConversions, unit_conversions
+from ..value_reference_group import NotEvaluated, ValueReferenceGroup, np
+
+
+class TestUnits(TestCase):
+
+    def setUp(self):
+        self.report_datetime = utc.localize(datetime(2017, 12, 7))
+        self.dob = self.report_datetime - relativedelta(years=25)
+        self.opts = dict(name='creatinine', gender=[MALE, FEMALE], age_lower=18,
+                         age_units='years', age_lower_inclusive=True)
+
+    def test_conversions(self):
+        conversions = UnitConversions()
+        conversions.register('mg/dL', 'umol/L', 88.42, name='creatinine')
+        conversions.register('mmol/L', 'umol/L', 1000)
+        self.assertEqual(conversions.get_factor('mg/dL', 'umol/L', name='creatinine'), 88.42)
+        self.assertEqual(
+            conversions.get_factor('umol/L', 'mg/dL', name='creatinine'), 1 / 88.42)
+        self.assertEqual(conversions.get_factor('umol/L', 'mmol/L', name='sodium'), 0.001)
+        self.assertEqual(conversions.get_factor('mg/dL', 'mg/dL'), 1)
+        self.assertRaises(
+            ConversionNotFound, conversions.get_factor, 'mg/dL', 'umol/L', name='glucose')
+
+    def test_convert_value(self):
+        grp = ValueReferenceGroup(name='creatinine')
+        grp.add_normal(NormalReference(
+            lower=0.6, upper=1.3, units='mg/dL', lower_inclusive=True,
+            upper_inclusive=True, **self.opts))
+        opts = dict(gender=MALE, dob=self.dob, report_datetime=self.report_datetime)
+        self.assertTrue(grp.get_normal(value=1.0, units='mg/dL', **opts))
+        self.assertTrue(grp.get_normal(value=88.42, units='umol/L', **opts))
+        self.assertFalse(grp.get_normal(value=120, units='umol/L', **opts))
+        self.assertRaises(
+            NotEvaluated, grp.get_normal, value=1.0, units='IU/L', **opts)
+
+    def test_many_requires_numpy(self):
+        grp = ValueReferenceGroup(name='creatinine')
+        with mock.patch('edc_reportable.value_reference_group.np', None):
+            self.assertRaises(ImportError, grp.get_normal_many, [1.0])
+            self.assertRaises(ImportError, grp.get_grade_many, [1.0])
+
+    @skipIf(np is None, 'numpy is not installed')
+    def test_convert_value_many(self):
+        grp = ValueReferenceGroup(name='creatinine')
+        grp.add_normal(NormalReference(
+            lower=0.6, upper=1.3, units='mg/dL', lower_inclusive=True,
+            upper_inclusive=True, **self.opts))
+        normal = grp.get_normal_many(
+            [1.0, 88.42, 120], units=['mg/dL', 'umol/L', 'umol/L'],
+            genders=[MALE] * 3, dobs=[self.dob] * 3,
+            report_datetimes=self.report_datetime)
+        self.assertEqual(list(normal), [True, True, False])
+
+    def test_canonical_units(self):
+        grp = ValueReferenceGroup(name='creatinine', units='mg/dL')
+        grp.add_normal(NormalReference(
+            lower=53, upper=115, units='umol/L', lower_inclusive=True,
+            upper_inclusive=True, **self.opts))
+        grp.add_grading(GradeReference(
+            grade=4, lower=400, units='umol/L', **self.opts))
+        self.assertEqual(grp.normal_index.units, {'mg/dL'})
+        self.assertEqual(grp.grading_index.units, {'mg/dL'})
+        opts = dict(gender=MALE, dob=self.dob, report_datetime=self.report_datetime)
+        self.assertTrue(grp.get_normal(value=1.0, units='mg/dL', **opts))
+        grade = grp.get_grade(value=500, units='umol/L', **opts)
+        self.assertEqual(grade.grade, 4)
+        self.assertIn('mg/dL', grade.description)
+        self.assertRaises(
+            ConversionNotFound, grp.add_normal,
+            NormalReference(lower=1, units='IU/L', **self.opts))
+
+    def test_canonical_units_relative(self):
+        grp = ValueReferenceGroup(name='creatinine', units='mg/dL')
+        grp.add_normal(NormalReference(
+            lower=53, upper=115, units='umol/L', lower_inclusive=True,
+            upper_inclusive=True, **self.opts))
+        grp.add_grading(GradeReference(
+            grade=3, lower=1.8, lower_relative=ULN, lower_inclusive=True,
+            upper=3.5, upper_relative=ULN, units='umol/L', **self.opts))
+        ref = grp.grading[MALE + FEMALE][0]
+        self.assertEqual(ref.units, 'mg/dL')
+        self.assertAlmostEqual(ref.lower, 1.8 * 115 / 88.42)
+        opts = dict(gender=MALE, dob=self.dob, report_datetime=self.report_datetime)
+        self.assertEqual(grp.get_grade(value=300, units='umol/L', **opts).grade, 3)
+        self.assertIsNone(grp.get_grade(value=150, units='umol/L', **opts))
+
+    def test_convert_to_units_of_kind(self):
+        grp = ValueReferenceGroup(name='creatinine')
+        grp.add_normal(NormalReference(
+            lower=0.6, upper=1.3, units='mg/dL', lower_inclusive=True,
+            upper_inclusive=True, **self.opts))
+        grp.add_grading(GradeReference(grade=4, lower=400, units='umol/L', **self.opts))
+        opts = dict(gender=MALE, dob=self.dob, report_datetime=self.report_datetime)
+        self.assertEqual(grp.get_grade(value=0.5, units='mmol/L', **opts).grade, 4)
+        self.assertIsNone(grp.get_grade(value=0.1, units='mmol/L', **opts))
+        self.assertTrue(grp.get_normal(value=0.08, units='mmol/L', **opts))
+
+    def test_default_conversions(self):
+        self.assertEqual(
+            unit_conversions.get_factor('mg/dL', 'umol/L', name='creatinine'), 88.42)
+        # urea, not blood urea nitrogen, 60.06 g/mol
+        self.assertEqual(
+            unit_conversions.get_factor('mg/dL', 'mmol/L', name='urea'), 0.1665)
+        self.assertEqual(
+            unit_conversions.get_factor('mg/dL', 'mmol/L', name='bun'), 0.357)
+        self.assertEqual(unit_conversions.get_factor('10^9/L', 'cells/mm^3'), 1000)
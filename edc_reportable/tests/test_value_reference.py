@@ -229,3 +229,21 @@ class TestValueReference(TestCase):
             value=7.4, gender=FEMALE, dob=dob,
             report_datetime=report_datetime,
             units='mg/dL')
+
+    def test_immutable(self):
+        ref = NormalReference(
+            name='labtest',
+            lower=10,
+            upper=None,
+            units='mg/dL',
+            age_lower=18,
+            age_units='years',
+            gender=[MALE, FEMALE])
+        self.assertRaises(AttributeError, setattr, ref, 'lower', 11)
+        self.assertRaises(AttributeError, setattr, ref, 'extra', 11)
+        self.assertEqual(
+            ref.as_dict(),
+            dict(name='labtest', units='mg/dL', gender='MF', lower=10,
+                 lower_inclusive=None, upper=None, upper_inclusive=None,
+                 age_lower=18, age_upper=None, age_units='years',
+                 age_lower_inclusive=None, age_upper_inclusive=None))
@@ -15,3 +15,61 @@ TEN_X_3_PER_LITER = '10^3/L'
 TEN_X_3_PER_LITER_DISPLAY = mark_safe('10<sup>3</sup>/L')
 TEN_X_9_PER_LITER = '10^9/L'
 TEN_X_9_PER_LITER_DISPLAY = mark_safe('10<sup>9</sup>/L')
+
+
+class ConversionNotFound(Exception):
+    pass
+
+
+class UnitConversions:
+
+    """A registry of factors to convert a value from one unit
+    to another.
+
+    A factor may be registered for a single test, for example a
+    molar conversion, or for any test. The inverse factor is
+    registered at the same time.
+    """
+
+    def __init__(self):
+        self._factors = {}
+
+    def register(self, from_units=None, to_units=None, factor=None, name=None):
+        self._factors[(name, from_units, to_units)] = factor
+        self._factors[(name, to_units, from_units)] = 1 / factor
+
+    def items(self):
+        """Returns a sorted list of ((name, from_units, to_units), factor).
+        """
+        return sorted(self._factors.items(), key=str)
+
+    def get_factor(self, from_units=None, to_units=None, name=None):
+        """Returns the factor to multiply a value in `from_units`
+        by to get the value in `to_units` or raises.
+        """
+        if from_units == to_units:
+            return 1
+        try:
+            return self._factors[(name, from_units, to_units)]
+        except KeyError:
+            try:
+                return self._factors[(None, from_units, to_units)]
+            except KeyError:
+                raise ConversionNotFound(
+                    f'Unable to convert {from_units} to {to_units} for {name}.')
+
+
+unit_conversions = UnitConversions()
+unit_conversions.register(MILLIMOLES_PER_LITER, MICROMOLES_PER_LITER, 1000)
+unit_conversions.register(GRAMS_PER_DECILITER, MILLIGRAMS_PER_DECILITER, 1000)
+unit_conversions.register(TEN_X_9_PER_LITER, CELLS_PER_MILLIMETER_CUBED, 1000)
+unit_conversions.register(
+    MILLIGRAMS_PER_DECILITER, MICROMOLES_PER_LITER, 88.42, name='creatinine')
+unit_conversions.register(
+    MILLIGRAMS_PER_DECILITER, MILLIMOLES_PER_LITER, 0.08842, name='creatinine')
+unit_conversions.register(
+    MILLIGRAMS_PER_DECILITER, MILLIMOLES_PER_LITER, 0.0555, name='glucose')
+unit_conversions.register(
+    MILLIGRAMS_PER_DECILITER, MILLIMOLES_PER_LITER, 0.1665, name='urea')
+unit_conversions.register(
+    MILLIGRAMS_PER_DECILITER, MILLIMOLES_PER_LITER, 0.357, name='bun')
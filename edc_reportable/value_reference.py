@@ -1,24 +1,50 @@
 from .age_evaluator import AgeEvaluator
-from .evaluator import Evaluator, ValueBoundryError
+from .evaluator import Evaluator
 
 
 class ValueReference:
 
+    """A reference range for a value, gender and age.
+
+    Instances are immutable.
+    """
+
     age_evaluator_cls = AgeEvaluator
     evaluator_cls = Evaluator
 
+    fields = ('name', 'units', 'gender', 'lower', 'lower_inclusive', 'upper',
+              'upper_inclusive', 'age_lower', 'age_upper', 'age_units',
+              'age_lower_inclusive', 'age_upper_inclusive')
+
+    __slots__ = fields + ('age_evaluator', 'evaluator')
+
+    relative = False
+
     def __init__(self, name=None, gender=None, units=None, **kwargs):
-        self.name = name
-        self.units = units
         if isinstance(gender, (list, tuple)):
-            self.gender = ''.join(gender)
-        else:
-            self.gender = gender
-        self.age_evaluator = self.age_evaluator_cls(**kwargs)
-        self.evaluator = self.evaluator_cls(
-            name=self.name, units=units, **kwargs)
+            gender = ''.join(gender)
+        self._set(name=name, units=units, gender=gender)
+        self._set(**{field: kwargs.get(field) for field in self.fields
+                     if field not in ['name', 'units', 'gender']})
+        self._set(
+            age_evaluator=self.age_evaluator_cls(**kwargs),
+            evaluator=(None if self.relative
+                       else self.evaluator_cls(name=name, units=units, **kwargs)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            f'{self.__class__.__name__} is immutable. Got {name}={value}.')
+
+    def _set(self, **kwargs):
         for key, value in kwargs.items():
-            setattr(self, key, value)
+            object.__setattr__(self, key, value)
+
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for cls in type(self).__mro__
+                for slot in getattr(cls, '__slots__', ())}
+
+    def __setstate__(self, state):
+        self._set(**state)
 
     def __repr__(self):
         return (f'{self.__class__.__name__}({self.name}, {self.description()})')
@@ -26,17 +52,26 @@ class ValueReference:
     def description(self, **kwargs):
         return (f'{self.evaluator.description(**kwargs)} {self.gender}')
 
-    def in_bounds(self, value=None, **kwargs):
-        try:
-            in_bounds = self.evaluator.in_bounds_or_raise(value, **kwargs)
-        except ValueBoundryError:
-            in_bounds = False
-        return in_bounds
-
-    def age_match(self, dob=None, report_datetime=None, age_units=None):
-        try:
-            age_match = self.age_evaluator.in_bounds_or_raise(
-                dob=dob, report_datetime=report_datetime, age_units=age_units)
-        except ValueBoundryError:
-            age_match = False
-        return age_match
+    def convert(self, units=None, factor=None):
+        """Returns a new reference with the bounds multiplied
+        by `factor` and declared in `units`.
+        """
+        kwargs = self.as_dict()
+        for bound in ['lower', 'upper']:
+            if kwargs[bound] is not None:
+                kwargs[bound] = round(float(kwargs[bound]) * factor, 10)
+        kwargs.update(units=units)
+        return self.__class__(**kwargs)
+
+    def as_dict(self):
+        """Returns a new dictionary of the reference fields.
+        """
+        return {field: getattr(self, field) for field in self.fields}
+
+    def in_bounds(self, value=None, units=None, **kwargs):
+        return self.evaluator.in_bounds(value, units=units)
+
+    def age_match(self, dob=None, report_datetime=None, age_units=None, rdelta=None):
+        return self.age_evaluator.in_bounds(
+            dob=dob, report_datetime=report_datetime, age_units=age_units,
+            rdelta=rdelta)
@@ -1,4 +1,16 @@
-from edc_base.utils import get_utcnow
+from collections.abc import Iterable
+from itertools import repeat
+from operator import attrgetter
+
+from .age_evaluator import get_age
+from .reference_index import ReferenceIndex
+from .result_cache import MISSING, ResultCache
+from .units import unit_conversions, ConversionNotFound
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 GRADING = 'grading'
@@ -27,20 +39,38 @@ class NotEvaluated(Exception):
 
 class Result:
 
+    """The result of an evaluation.
+
+    `description` is a callable that is only called, once, when
+    the description is first accessed.
+    """
+
+    __slots__ = ('_value', '_describe', '_description')
+
     def __init__(self, value, description):
         self._value = value
-        self.description = description(value=value)
+        self._describe = description
+        self._description = None
 
     def __str__(self):
         return self.description
 
+    @property
+    def description(self):
+        if self._description is None:
+            self._description = self._describe(value=self._value)
+        return self._description
+
 
 class Normal(Result):
-    pass
+
+    __slots__ = ()
 
 
 class Grade(Result):
 
+    __slots__ = ('grade', )
+
     def __init__(self, value, grade, description):
         super().__init__(value, description)
         self.grade = grade
@@ -48,25 +78,72 @@ class Grade(Result):
 
 class ValueReferenceGroup:
 
-    def __init__(self, name=None):
+    """A group of normal and grading references for one test.
+
+    Set `age_func` to `cached_age` to memoize the age calculation
+    across calls, e.g. when grading a panel for each subject visit.
+    `age_func` is called with (dob, report_datetime) where
+    report_datetime is None for the age now.
+
+    Call `enable_cache` to memoize results of `get_normal` and
+    `get_grade`.
+
+    Once `validate` has passed, evaluation stops at the first
+    matching reference. Adding a reference clears the flag.
+
+    If `units` is given, references declared in other units are
+    converted to `units` when added. A value in units without a
+    reference is converted to units with a reference, preferring
+    `units` or the units of the first reference added, before it
+    is evaluated.
+    """
+
+    age_func = staticmethod(get_age)
+    conversions = unit_conversions
+
+    def __init__(self, name=None, units=None):
         self.name = name
+        self.units = units
         self.normal = {}
         self.grading = {}
+        self.normal_index = ReferenceIndex()
+        self.grading_index = ReferenceIndex(sort_key=attrgetter('grade'), reverse=True)
+        self.cache = None
+        self.validated = False
+        self._factors = {}
+        self._target_units = units
 
     def __repr__(self):
         return f'{self.__class__.__name__}(name={self.name})'
 
+    def __getstate__(self):
+        """Drops instrumentation, which is per process.
+        """
+        state = self.__dict__.copy()
+        for attr in ['get_normal', 'get_grade', '_get_references']:
+            state.pop(attr, None)
+        return state
+
     def add_normal(self, normal_reference):
         """Adds a ValueReference to the dictionary of
         normal references.
         """
-        self._add(normal_reference, self.normal)
+        self._add(normal_reference, self.normal, self.normal_index)
 
     def add_grading(self, grade_reference):
         """Adds a GradeReference to the dictionary of
         grading references.
+
+        A GradeReference relative to the ULN or LLN is compiled
+        against each normal reference already added with the same
+        units and a common gender and age range. If the group has
+        `units`, it is converted first.
         """
-        self._add(grade_reference, self.grading)
+        if grade_reference.relative:
+            for ref in self._resolve(self._to_units(grade_reference)):
+                self._add(ref, self.grading, self.grading_index)
+        else:
+            self._add(grade_reference, self.grading, self.grading_index)
 
     def get_normal_description(self, **kwargs):
         """Returns a list of descriptions of the normal references
@@ -77,13 +154,83 @@ class ValueReferenceGroup:
             descriptions.append(value_ref.description())
         return descriptions
 
-    def get_normal(self, value=None, **kwargs):
+    def get_normal(self, value=None, units=None, **kwargs):
         """Returns a Normal instance or None.
+
+        Pass `rdelta` instead of `dob` and `report_datetime` to
+        reuse an age already calculated for this subject.
+        """
+        value, units = self._convert(value, units, self.normal_index)
+        if self.cache is not None:
+            return self._get_cached(
+                NORMAL, self._get_normal, value, units=units, **kwargs)
+        return self._get_normal(value, units=units, **kwargs)
+
+    def get_grade(self, value=None, units=None, **kwargs):
+        """Returns a Grade instance or None.
+
+        Accepts `rdelta` as for `get_normal`.
+        """
+        value, units = self._convert(value, units, self.grading_index)
+        if self.cache is not None:
+            return self._get_cached(
+                GRADING, self._get_grade, value, units=units, **kwargs)
+        return self._get_grade(value, units=units, **kwargs)
+
+    async def aget_normal(self, value=None, units=None, **kwargs):
+        """Returns a Normal instance or None, as for `get_normal`.
+
+        The group is already built and evaluation does no I/O and
+        takes no lock held for long, so it runs in the event loop
+        without awaiting. Get the group from a collection with
+        `await streaming.warm(reference_collection)` first if groups
+        are registered lazily.
+        """
+        return self.get_normal(value=value, units=units, **kwargs)
+
+    async def aget_grade(self, value=None, units=None, **kwargs):
+        """Returns a Grade instance or None, as for `get_grade`.
+        """
+        return self.get_grade(value=value, units=units, **kwargs)
+
+    def get_overlaps(self):
+        """Returns a list of descriptions of each pair of normal
+        or grading references with overlapping boundaries.
+        """
+        overlaps = []
+        for index in [self.normal_index, self.grading_index]:
+            for ref1, ref2 in index.overlaps():
+                overlaps.append(
+                    f'{self.name}: {ref1.description()} overlaps {ref2.description()}')
+        return overlaps
+
+    def validate(self):
+        """Raises BoundariesOverlap listing all overlapping
+        references, if any.
+        """
+        overlaps = self.get_overlaps()
+        if overlaps:
+            raise BoundariesOverlap(
+                'Check your definitions. ' + '; '.join(overlaps))
+        self.validated = True
+
+    def enable_cache(self, maxsize=None):
+        """Memoizes results on (value, units, gender, age band).
+
+        The cache is cleared when a reference is added.
         """
+        self.cache = ResultCache(maxsize=maxsize)
+
+    def disable_cache(self):
+        self.cache = None
+
+    def _get_normal(self, value=None, **kwargs):
         normal = None
         for value_ref in self._get_normal_references(**kwargs):
-            if value_ref.in_bounds(value=value, **kwargs):
-                if not normal:
+            if value_ref.evaluator.in_bounds(value):
+                if self.validated:
+                    return Normal(value, value_ref.description)
+                elif not normal:
                     normal = Normal(value, value_ref.description)
                 else:
                     raise BoundariesOverlap(
@@ -92,13 +239,13 @@ class ValueReferenceGroup:
                         f'Check your definitions.')
         return normal
 
-    def get_grade(self, value=None, **kwargs):
-        """Returns a Grade instance or None.
-        """
+    def _get_grade(self, value=None, **kwargs):
         grade = None
         for grade_ref in self._get_grading_references(**kwargs):
-            if grade_ref.in_bounds(value=value, **kwargs):
-                if not grade:
+            if grade_ref.evaluator.in_bounds(value):
+                if self.validated:
+                    return Grade(value, grade_ref.grade, grade_ref.description)
+                elif not grade:
                     grade = Grade(value, grade_ref.grade,
                                   grade_ref.description)
                 else:
@@ -108,11 +255,114 @@ class ValueReferenceGroup:
                         f'Check your definitions.')
         return grade
 
+    def _get_cached(self, kind, func, value, units=None, gender=None,
+                    dob=None, report_datetime=None, rdelta=None):
+        """Returns the result of `func` from the cache or calls
+        `func` and caches the result.
+
+        The key uses the age band that selects the references,
+        not the dob or report_datetime.
+        """
+        if rdelta is None:
+            rdelta = self.age_func(dob, report_datetime)
+        index = self.normal_index if kind == NORMAL else self.grading_index
+        key = (kind, value, units, gender,
+               index.bucket(units=units, gender=gender, rdelta=rdelta))
+        result = self.cache.get(key)
+        if result is MISSING:
+            result = func(value, units=units, gender=gender, rdelta=rdelta)
+            self.cache.set(key, result)
+        return result
+
+    def get_normal_many(self, values=None, **kwargs):
+        """Returns a numpy array of booleans, True where the
+        value is normal.
+
+        See `_match_many` for the arguments.
+        """
+        if np is None:
+            raise ImportError('Batch evaluation requires numpy.')
+        normal = np.zeros(len(values), dtype=bool)
+        for _, in_bounds in self._match_many(
+                self.normal, self.normal_index, values, **kwargs):
+            normal |= in_bounds
+        return normal
+
+    def get_grade_many(self, values=None, **kwargs):
+        """Returns a numpy array of grades where 0 means
+        the value was not graded.
+
+        See `_match_many` for the arguments.
+        """
+        if np is None:
+            raise ImportError('Batch evaluation requires numpy.')
+        grades = np.zeros(len(values), dtype=int)
+        for grade_ref, in_bounds in self._match_many(
+                self.grading, self.grading_index, values, **kwargs):
+            grades[in_bounds] = grade_ref.grade
+        return grades
+
+    def _match_many(self, value_references, index, values, units=None, genders=None,
+                    dobs=None, report_datetimes=None):
+        """Yields a tuple of (reference, boolean array) for each
+        reference, where the array flags the values in bounds
+        for that reference.
+
+        `values`, `genders` and `dobs` are sequences, numpy arrays
+        or pandas Series of the same length. `units` and
+        `report_datetimes` are either sequences or a single value
+        for all rows. A report datetime of None is now, as for
+        `get_normal`.
+
+        Values in units without a reference are converted as
+        for `get_normal`.
+
+        Raises BoundariesOverlap if a value matches more than one
+        reference and NotEvaluated if any value has no reference
+        range.
+        """
+        values = np.asarray(values, dtype=float)
+        size = len(values)
+        units = np.full(size, units) if isinstance(units, str) else np.asarray(units)
+        values, units = self._convert_many(values, units, index)
+        genders = np.asarray(genders)
+        if not isinstance(report_datetimes, Iterable):
+            report_datetimes = repeat(report_datetimes)
+        rdeltas = [self.age_func(dob, report_datetime)
+                   for dob, report_datetime in zip(dobs, report_datetimes)]
+        ages = {}
+        evaluated = np.zeros(size, dtype=bool)
+        matched = np.zeros(size, dtype=bool)
+        for refs in value_references.values():
+            for ref in refs:
+                age_units = ref.age_evaluator.units
+                if age_units not in ages:
+                    ages[age_units] = np.array(
+                        [getattr(rdelta, age_units) for rdelta in rdeltas], dtype=float)
+                selected = (
+                    np.isin(genders, list(ref.gender))
+                    & (units == ref.units)
+                    & ref.age_evaluator.in_bounds_mask(ages[age_units]))
+                evaluated |= selected
+                in_bounds = selected & ref.evaluator.in_bounds_mask(values)
+                if (matched & in_bounds).any():
+                    index = np.flatnonzero(matched & in_bounds)[0]
+                    raise BoundariesOverlap(
+                        f'Value at index {index} matched more than one reference. '
+                        f'Got {ref.description(value=values[index])}. '
+                        f'Check your definitions.')
+                matched |= in_bounds
+                yield ref, in_bounds
+        if not evaluated.all():
+            index = np.flatnonzero(~evaluated)[0]
+            raise NotEvaluated(
+                f'{self.name} value at index {index} not evaluated. '
+                f'No reference range found. See {repr(self)}.')
+
     def _get_normal_references(self, **kwargs):
-        """Returns a list of ValueReference instances or raises.
+        """Returns a tuple of ValueReference instances or raises.
         """
-        references = self._get_references(
-            value_references=self.normal, **kwargs)
+        references = self._get_references(index=self.normal_index, **kwargs)
         if not references:
             raise NotEvaluated(
                 f'{self.name} value not evaluated. '
@@ -120,40 +370,111 @@ class ValueReferenceGroup:
         return references
 
     def _get_grading_references(self, **kwargs):
-        """Returns a list of GradeReference instances or raises.
+        """Returns a tuple of GradeReference instances, highest
+        grade first, or raises.
         """
-        references = self._get_references(
-            value_references=self.grading, **kwargs)
+        references = self._get_references(index=self.grading_index, **kwargs)
         if not references:
             raise NotEvaluated(
                 f'{self.name} value not graded. '
                 f'No reference range found for {kwargs}. See {repr(self)}.')
-        references.sort(key=lambda x: x.grade, reverse=True)
         return references
 
-    def _get_references(self, value_references=None, gender=None,
-                        dob=None, report_datetime=None, units=None):
-        """Returns a list of references for this
+    def _get_references(self, index=None, gender=None, dob=None,
+                        report_datetime=None, units=None, rdelta=None):
+        """Returns a tuple of references for this
         gender, age and units.
 
         Either ValueReferences or GradeReferences.
+
+        The age is calculated from `dob` and `report_datetime`
+        unless `rdelta`, the age as a relativedelta, is passed.
+        """
+        if rdelta is None:
+            rdelta = self.age_func(dob, report_datetime)
+        return index.get(units=units, gender=gender, rdelta=rdelta)
+
+    def _resolve(self, grade_reference):
+        """Returns a list of GradeReferences with absolute bounds
+        for a relative GradeReference or raises.
         """
         references = []
-        report_datetime = report_datetime or get_utcnow()
-        for refs in value_references.values():
-            references.extend([
-                ref for ref in refs
-                if gender in ref.gender
-                and ref.units == units
-                and ref.age_match(dob, report_datetime)])
+        for normal_refs in self.normal.values():
+            for normal_ref in normal_refs:
+                if normal_ref.units == grade_reference.units:
+                    ref = grade_reference.resolve(normal_ref)
+                    if ref:
+                        references.append(ref)
+        if not references:
+            raise ValueReferenceNotFound(
+                f'No normal reference found to resolve {repr(grade_reference)}. '
+                f'Add normal references before relative grading references.')
         return references
 
-    def _add(self, value_reference, value_references):
+    def _convert(self, value, units, index):
+        """Returns the value and units, converted if there are
+        no references in these units.
+        """
+        if units in index.units or value is None:
+            return value, units
+        to_units, factor = self._get_factor(units, index)
+        if factor is None:
+            return value, units
+        return float(value) * factor, to_units
+
+    def _convert_many(self, values, units, index):
+        """Returns numpy arrays of values and units as for `_convert`.
+        """
+        for from_units in np.unique(units):
+            if from_units not in index.units:
+                to_units, factor = self._get_factor(from_units, index)
+                if factor is not None:
+                    converting = units == from_units
+                    values = np.where(converting, values * factor, values)
+                    units = np.where(converting, to_units, units)
+        return values, units
+
+    def _get_factor(self, units, index):
+        """Returns a tuple of (units, factor) to convert a value
+        in `units` to units with references in `index`, preferring
+        the units of the group.
+
+        The factor is None if there is no conversion.
+        """
+        key = (units, index is self.grading_index)
+        try:
+            return self._factors[key]
+        except KeyError:
+            self._factors[key] = (units, None)
+            for to_units in [self._target_units] + sorted(index.units):
+                if to_units in index.units:
+                    try:
+                        factor = self.conversions.get_factor(
+                            units, to_units, name=self.name)
+                    except ConversionNotFound:
+                        continue
+                    self._factors[key] = (to_units, factor)
+                    break
+        return self._factors[key]
+
+    def _to_units(self, value_reference):
+        """Returns the reference converted to the units of the
+        group, if any.
+        """
+        if self.units and value_reference.units != self.units:
+            value_reference = value_reference.convert(
+                units=self.units,
+                factor=self.conversions.get_factor(
+                    value_reference.units, self.units, name=self.name))
+        return value_reference
+
+    def _add(self, value_reference, value_references, index):
         if value_reference.name != self.name:
             raise InvalidValueReference(
                 f'Cannot add to group; name does not match. '
                 f'Expected \'{self.name}\'. Got \'{value_reference.name}\'. '
                 f'See {repr(value_reference)}')
+        value_reference = self._to_units(value_reference)
         try:
             if value_reference in value_references[value_reference.gender]:
                 raise ValueReferenceAlreadyAdded(
@@ -161,3 +482,9 @@ class ValueReferenceGroup:
         except KeyError:
             value_references[value_reference.gender] = []
         value_references[value_reference.gender].append(value_reference)
+        index.add(value_reference)
+        self.validated = False
+        self._target_units = self._target_units or value_reference.units
+        self._factors = {}
+        if self.cache is not None:
+            self.cache.clear()
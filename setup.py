@@ -21,6 +21,7 @@ setup(
     long_description=README,
     include_package_data=True,
     zip_safe=False,
+    extras_require={'numpy': ['numpy'], 'parquet': ['pyarrow']},
     keywords='django Edc normal clinical reference ranges grading',
     classifiers=[
         'Environment :: Web Environment',